@@ -0,0 +1,338 @@
+# benchmarks/bench.py
+"""
+Benchmark-/Lasttest-Suite gegen das Fake-Backend (kein SQL Server nötig).
+
+Misst je Transport, Tool und Concurrency-Stufe Durchsatz sowie p50/p90/p99-Latenz:
+  inproc  _handle direkt (Threads)             + Micro-Benchmarks für Guards/_jsonify_row
+  stdio   run_stdio       (Subprozess, Pipelining-Tiefe = Concurrency)
+  mcp     run_mcp_server  (Subprozess, Pipelining-Tiefe = Concurrency)
+  http    http.app        (uvicorn-Subprozess, parallele Keep-Alive-Verbindungen)
+
+Beispiele:
+  python -m benchmarks.bench --out base.json
+  python -m benchmarks.bench --out new.json --compare base.json --fail-on-regression 20
+  python -m benchmarks.bench --transports inproc,http --levels 1,8 --fake query_ms=5,table_rows=1000
+  python -m benchmarks.bench --transports http --http-workers 4 --env DB_MAX_CONCURRENCY=8
+"""
+import argparse, datetime, http.client, json, os, platform, socket, subprocess, sys, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path: sys.path.insert(0, ROOT)
+
+TABLE = "dbo.CRONUS AG$Customer"
+SQL = "SELECT [No_], [Name], [Amount] FROM [dbo].[CRONUS AG$Customer] WHERE [Blocked] = 0"
+
+# Tool -> (Legacy-Action-Payload, MCP-tools/call-Params oder None, wenn dort nicht angeboten)
+TOOL_CALLS: Dict[str, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = {
+    "tables":   ({"action": "tables"}, {"name": "tables", "arguments": {}}),
+    "columns":  ({"action": "columns", "table": TABLE}, {"name": "columns", "arguments": {"table": TABLE}}),
+    "columns_with_examples": ({"action": "columns_with_examples", "table": TABLE, "n": 3},
+                              {"name": "columns_with_examples", "arguments": {"table": TABLE, "n": 3}}),
+    "query":    ({"action": "query", "sql": SQL}, {"name": "query", "arguments": {"sql": SQL}}),
+    "sample":   ({"action": "sample", "table": TABLE, "n": 20},
+                 {"name": "sample", "arguments": {"table": TABLE, "n": 20}}),
+    "paginate": ({"action": "paginate", "sql": SQL, "offset": 100, "fetch": 50},
+                 {"name": "paginate", "arguments": {"sql": SQL, "offset": 100, "fetch": 50}}),
+    "stats":    ({"action": "stats", "table": TABLE}, {"name": "stats", "arguments": {"table": TABLE}}),
+    "explain":  ({"action": "explain", "sql": SQL}, {"name": "explain", "arguments": {"sql": SQL}}),
+    "search_schema": ({"action": "search_schema", "q": "customer ledger amount"},
+                      {"name": "search_schema", "arguments": {"q": "customer ledger amount"}}),
+    "profile_column": ({"action": "profile_column", "table": TABLE, "column": "Name"},
+                       {"name": "profile_column", "arguments": {"table": TABLE, "column": "Name"}}),
+    "column_stats": ({"action": "column_stats", "table": TABLE},
+                     {"name": "column_stats", "arguments": {"table": TABLE}}),
+}
+
+# Server-Konfiguration für Benchmarks: keine Allow-/Deny-Listen aus einer lokalen .env übernehmen
+BENCH_ENV = {"ALLOW_TABLES": "", "ALLOW_SCHEMAS": "", "DENY_COLUMNS": "", "DENY_PATTERNS": "",
+             "MSSQL_DATABASE": "bench", "LOG_LEVEL": "WARNING", "WARMUP": "false"}
+
+
+# ---- Statistik ----
+def percentile(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals: return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100.0 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+def summarize(transport: str, tool: str, conc: int, lat_s: List[float], errors: int, wall_s: float) -> Dict[str, Any]:
+    ms = sorted(x * 1000 for x in lat_s)
+    return {
+        "transport": transport, "tool": tool, "concurrency": conc,
+        "requests": len(ms), "errors": errors,
+        "rps": round(len(ms) / wall_s, 1) if wall_s > 0 else None,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else None,
+        "p50_ms": round(percentile(ms, 50), 3), "p90_ms": round(percentile(ms, 90), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+# ---- Transporte ----
+class PipeClient:
+    """stdio/mcp-Subprozess; Antworten kommen in Request-Reihenfolge."""
+
+    def __init__(self, transport: str, env: Dict[str, str], stderr):
+        self.transport = transport
+        self.proc = subprocess.Popen([sys.executable, "-m", "benchmarks.serve", transport], cwd=ROOT, env=env,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+                                     text=True, encoding="utf-8", bufsize=1)
+        self._id = 0
+        if transport == "mcp":
+            self.roundtrip({"jsonrpc": "2.0", "id": 0, "method": "initialize", "params": {}})
+
+    def encode(self, tool: str) -> Optional[Dict[str, Any]]:
+        legacy, mcp = TOOL_CALLS[tool]
+        if self.transport == "stdio": return dict(legacy)
+        if mcp is None: return None
+        self._id += 1
+        return {"jsonrpc": "2.0", "id": self._id, "method": "tools/call", "params": mcp}
+
+    @staticmethod
+    def is_error(resp: Dict[str, Any]) -> bool:
+        return resp.get("ok") is False or "error" in resp
+
+    def roundtrip(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.proc.stdin.write(json.dumps(payload) + "\n"); self.proc.stdin.flush()
+        return json.loads(self.proc.stdout.readline())
+
+    def run(self, tool: str, n: int, depth: int) -> Optional[Tuple[List[float], int, float]]:
+        payloads = [self.encode(tool) for _ in range(n)]
+        if payloads[0] is None: return None
+        sent: deque = deque()
+        slots = threading.Semaphore(depth)
+        lat: List[float] = []
+        errors = 0
+
+        def writer():
+            for p in payloads:
+                slots.acquire()
+                sent.append(time.perf_counter())
+                self.proc.stdin.write(json.dumps(p) + "\n"); self.proc.stdin.flush()
+
+        t0 = time.perf_counter()
+        th = threading.Thread(target=writer, daemon=True); th.start()
+        for _ in payloads:
+            line = self.proc.stdout.readline()
+            lat.append(time.perf_counter() - sent.popleft())
+            slots.release()
+            if self.is_error(json.loads(line)): errors += 1
+        th.join()
+        return lat, errors, time.perf_counter() - t0
+
+    def close(self):
+        try:
+            self.proc.stdin.close(); self.proc.wait(timeout=10)
+        except Exception:
+            self.proc.kill()
+
+
+class HttpClient:
+    def __init__(self, env: Dict[str, str], stderr, workers: int = 1):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0)); self.port = s.getsockname()[1]
+        self.proc = subprocess.Popen([sys.executable, "-m", "benchmarks.serve", "http", "--port", str(self.port),
+                                      "--workers", str(workers)],
+                                     cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                self._post(http.client.HTTPConnection("127.0.0.1", self.port, timeout=5), {"action": "ping"}); return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError("HTTP-Server nicht erreichbar")
+
+    @staticmethod
+    def _post(conn: http.client.HTTPConnection, payload: Dict[str, Any]) -> Dict[str, Any]:
+        conn.request("POST", "/mcp", body=json.dumps(payload), headers={"Content-Type": "application/json"})
+        return json.loads(conn.getresponse().read())
+
+    def run(self, tool: str, n: int, conc: int) -> Tuple[List[float], int, float]:
+        payload = TOOL_CALLS[tool][0]
+        lat: List[float] = []
+        errors = [0]
+        lock = threading.Lock()
+
+        def worker(k: int):
+            conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            for _ in range(k):
+                t = time.perf_counter()
+                resp = self._post(conn, payload)
+                d = time.perf_counter() - t
+                with lock:
+                    lat.append(d)
+                    if not resp.get("ok"): errors[0] += 1
+            conn.close()
+
+        shares = [n // conc + (1 if i < n % conc else 0) for i in range(conc)]
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(conc) as ex: list(ex.map(worker, shares))
+        return lat, errors[0], time.perf_counter() - t0
+
+    def close(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except Exception:
+            self.proc.kill()
+
+
+def run_inproc(tools: List[str], levels: List[int], n: int, fake_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from benchmarks import fake_pymssql
+    server = fake_pymssql.install(fake_cfg)
+    results = []
+    for tool in tools:
+        payload = TOOL_CALLS[tool][0]
+        for _ in range(3): server._handle(dict(payload))   # Katalog/Caches warm
+        for conc in levels:
+            lat: List[float] = []
+            errors = [0]
+            lock = threading.Lock()
+
+            def one(_):
+                t = time.perf_counter()
+                ok = server._handle(dict(payload)).get("ok")
+                d = time.perf_counter() - t
+                with lock:
+                    lat.append(d)
+                    if not ok: errors[0] += 1
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(conc) as ex: list(ex.map(one, range(n)))
+            results.append(summarize("inproc", tool, conc, lat, errors[0], time.perf_counter() - t0))
+
+    # Micro-Benchmarks ohne DB
+    import datetime as dt, decimal, uuid
+    cols = ["No_", "Amount", "Posting Date", "Id", "Picture", "Name"]
+    row = ("C00010", decimal.Decimal("1234.50"), dt.datetime(2024, 5, 1, 12), uuid.uuid4(), b"\x00" * 4096, "Müller")
+    micro: Dict[str, Callable[[], Any]] = {
+        "ensure_safe_sql": lambda: server.ensure_safe_sql(SQL),
+        "jsonify_row": lambda: server._jsonify_row(cols, row),
+        "explain": lambda: server.tool_explain(SQL),
+    }
+    for name, fn in micro.items():
+        reps = max(1000, n * 10)
+        lat = []
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            t = time.perf_counter(); fn(); lat.append(time.perf_counter() - t)
+        results.append(summarize("micro", name, 1, lat, 0, time.perf_counter() - t0))
+    return results
+
+
+def run_subprocess(transport: str, tools: List[str], levels: List[int], n: int,
+                   env: Dict[str, str], stderr, http_workers: int = 1) -> List[Dict[str, Any]]:
+    client = HttpClient(env, stderr, http_workers) if transport == "http" else PipeClient(transport, env, stderr)
+    results = []
+    try:
+        for tool in tools:
+            if client.run(tool, 3, 1) is None: continue      # Warm-up; None = Tool im Transport nicht vorhanden
+            for conc in levels:
+                lat, errors, wall = client.run(tool, n, conc)
+                results.append(summarize(transport, tool, conc, lat, errors, wall))
+    finally:
+        client.close()
+    return results
+
+
+# ---- Vergleich ----
+def compare(base: Dict[str, Any], cur: Dict[str, Any], threshold_pct: float) -> List[str]:
+    """Gibt Tabellenzeilen aus und liefert die Liste der Regressionen (p99 oder Durchsatz > threshold)."""
+    key = lambda r: (r["transport"], r["tool"], r["concurrency"])
+    old = {key(r): r for r in base.get("results", [])}
+    regressions = []
+    print(f"{'transport':8} {'tool':22} {'conc':>4} {'p50 Δ%':>8} {'p99 Δ%':>8} {'rps Δ%':>8}")
+    for r in cur.get("results", []):
+        b = old.get(key(r))
+        if not b: continue
+        pct = lambda new, was: ((new - was) / was * 100.0) if was else 0.0
+        d50, d99 = pct(r["p50_ms"], b["p50_ms"]), pct(r["p99_ms"], b["p99_ms"])
+        drps = pct(r["rps"] or 0, b["rps"] or 0)
+        flag = ""
+        if d99 > threshold_pct or -drps > threshold_pct:
+            flag = "  REGRESSION"; regressions.append("/".join(map(str, key(r))))
+        print(f"{r['transport']:8} {r['tool']:22} {r['concurrency']:>4} {d50:>8.1f} {d99:>8.1f} {drps:>8.1f}{flag}")
+    return regressions
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def _parse_kv(spec: str) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        k, _, v = part.partition("=")
+        try:
+            out[k] = json.loads(v)
+        except ValueError:
+            out[k] = v
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--transports", default="inproc,stdio,mcp,http")
+    ap.add_argument("--tools", default=",".join(TOOL_CALLS))
+    ap.add_argument("--levels", default="1,4,16", help="Concurrency-Stufen")
+    ap.add_argument("--requests", type=int, default=200, help="Requests je Tool und Stufe")
+    ap.add_argument("--fake", default="", help="Fake-Backend, z. B. query_ms=5,table_rows=1000")
+    ap.add_argument("--env", default="", help="zusätzliche Server-ENV, z. B. POOL_SIZE=0")
+    ap.add_argument("--http-workers", type=int, default=1, help="Worker-Prozesse für http (mssql_mcp_server.serve)")
+    ap.add_argument("--out", help="Ergebnisse als JSON schreiben")
+    ap.add_argument("--compare", help="mit früherem Ergebnis-JSON vergleichen")
+    ap.add_argument("--fail-on-regression", type=float, metavar="PCT",
+                    help="Exit-Code 1, wenn p99 oder Durchsatz um mehr als PCT %% schlechter")
+    ap.add_argument("--verbose", action="store_true", help="Server-Logs (stderr) anzeigen")
+    args = ap.parse_args(argv)
+
+    fake_cfg = _parse_kv(args.fake)
+    server_env = {**BENCH_ENV, **{k: str(v) for k, v in _parse_kv(args.env).items()}}
+    env = {**os.environ, **server_env, "MSSQL_FAKE_CONFIG": json.dumps(fake_cfg), "PYTHONPATH": ROOT}
+    os.environ.update(server_env)                          # für inproc vor dem Server-Import
+    os.environ["MSSQL_FAKE_CONFIG"] = json.dumps(fake_cfg)
+    stderr = None if args.verbose else subprocess.DEVNULL
+    tools = [t for t in args.tools.split(",") if t in TOOL_CALLS]
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    results: List[Dict[str, Any]] = []
+    for transport in [t.strip() for t in args.transports.split(",") if t.strip()]:
+        t0 = time.perf_counter()
+        if transport == "inproc":
+            saved = sys.stderr
+            if not args.verbose: sys.stderr = open(os.devnull, "w")
+            try:
+                results += run_inproc(tools, levels, args.requests, fake_cfg)
+            finally:
+                if sys.stderr is not saved: sys.stderr.close(); sys.stderr = saved
+        else:
+            results += run_subprocess(transport, tools, levels, args.requests, env, stderr, args.http_workers)
+        print(f"[bench] {transport}: {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    doc = {
+        "meta": {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "git_rev": _git_rev(),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "requests": args.requests, "levels": levels, "http_workers": args.http_workers, "fake": fake_cfg, "env": server_env},
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: json.dump(doc, f, indent=1)
+    else:
+        json.dump(doc, sys.stdout, indent=1); print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: base = json.load(f)
+        regressions = compare(base, doc, args.fail_on_regression or 20.0)
+        if regressions and args.fail_on_regression is not None:
+            print(f"[bench] {len(regressions)} Regression(en)", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
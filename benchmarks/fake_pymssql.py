@@ -0,0 +1,247 @@
+# benchmarks/fake_pymssql.py
+"""
+Deterministischer Fake für `pymssql` – für Benchmarks, Load-Tests und Replay ohne echten SQL Server.
+
+Konfiguration (dict bzw. JSON in MSSQL_FAKE_CONFIG):
+  tables            Anzahl Tabellen im Katalog                    (Standard 50)
+  table_rows        Zeilen je Tabelle (für TOP/COUNT/Stats)      (Standard 100000)
+  connect_ms        Latenz je Login                               (Standard 5)
+  query_ms          Grundlatenz je Statement                      (Standard 1)
+  row_us            zusätzliche Latenz je gelieferter Zeile       (Standard 2)
+  blob_bytes        Größe der image/varbinary(max)-Werte          (Standard 4096)
+  error_rate        Anteil fehlschlagender Statements (0..1)      (Standard 0)
+  error_code        SQL-Fehlernummer der injizierten Fehler       (Standard 1205 = Deadlock)
+  seed              Basis für die deterministische Datenerzeugung (Standard 1)
+  rowversion        Rückgabe von MIN_ACTIVE_ROWVERSION() (Standard 1; erhöhen = "Daten geändert")
+  changed_rows      Zeilen, die eine rowversion-Delta-Abfrage liefert  (Standard 0)
+
+`install(config)` registriert das Modul als `pymssql` und ersetzt `server._connect`.
+"""
+import datetime, decimal, json, os, random, re, sys, threading, time, uuid, zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULTS: Dict[str, Any] = {
+    "tables": 50, "table_rows": 100000, "connect_ms": 5, "query_ms": 1, "row_us": 2,
+    "blob_bytes": 4096, "error_rate": 0.0, "error_code": 1205, "seed": 1,
+    "rowversion": 1, "changed_rows": 0,
+}
+
+# (Name, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH) – NAV-typische Mischung inkl. Binär/Decimal/Datetime
+COLUMNS: List[Tuple[str, str, Optional[int]]] = [
+    ("timestamp", "timestamp", None),
+    ("No_", "nvarchar", 20),
+    ("Name", "nvarchar", 50),
+    ("Customer No_", "nvarchar", 20),
+    ("Amount", "decimal", None),
+    ("Posting Date", "datetime", None),
+    ("Blocked", "tinyint", None),
+    ("Document Id", "uniqueidentifier", None),
+    ("Picture", "image", None),
+    ("Comment", "nvarchar", -1),
+]
+
+config: Dict[str, Any] = dict(DEFAULTS)
+stats = {"connects": 0, "statements": 0, "rows": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+
+# ---- pymssql-Exception-Hierarchie ----
+class Error(Exception): pass
+class InterfaceError(Error): pass
+class DatabaseError(Error): pass
+class OperationalError(DatabaseError): pass
+class ProgrammingError(DatabaseError): pass
+class IntegrityError(DatabaseError): pass
+class DataError(DatabaseError): pass
+class NotSupportedError(DatabaseError): pass
+
+
+def table_names() -> List[Tuple[str, str]]:
+    names = ["Customer", "Sales Header", "Sales Line", "Item", "Vendor", "G_L Entry",
+             "Cust_ Ledger Entry", "Purchase Header", "Item Ledger Entry", "Value Entry"]
+    out = []
+    for i in range(int(config["tables"])):
+        base = names[i % len(names)] + (f" {i // len(names)}" if i >= len(names) else "")
+        out.append(("dbo", f"CRONUS AG${base}"))
+    return out
+
+
+def _value(rng: random.Random, dtype: str, max_len: Optional[int], i: int) -> Any:
+    if dtype == "datalength": return int(config["blob_bytes"])
+    if dtype in ("image", "varbinary", "timestamp"):
+        n = 8 if dtype == "timestamp" else int(config["blob_bytes"])
+        return rng.randbytes(n) if hasattr(rng, "randbytes") else bytes(rng.getrandbits(8) for _ in range(n))
+    if dtype == "nvarchar":
+        if max_len == -1: return "Kommentar " * 40 + str(i)
+        return f"{rng.choice(['A', 'B', 'C', 'K', 'M'])}{i:05d}"[: max_len or 20]
+    if dtype == "decimal": return decimal.Decimal(rng.randint(0, 10_000_000)) / 100
+    if dtype == "datetime": return datetime.datetime(2020, 1, 1) + datetime.timedelta(minutes=rng.randint(0, 2_000_000))
+    if dtype == "tinyint": return rng.randint(0, 1)
+    if dtype == "uniqueidentifier": return uuid.UUID(int=rng.getrandbits(128))
+    return rng.randint(0, 1_000_000)
+
+
+_top_rx   = re.compile(r"\btop\s+(\d+)", re.I)
+_fetch_rx = re.compile(r"\bfetch\s+next\s+(\d+)\s+rows", re.I)
+_proj_rx  = re.compile(r"^\s*select\s+(?:top\s+\d+\s+)?(?:distinct\s+)?(.*?)\s+from\s", re.I | re.S)
+
+
+class Cursor:
+    def __init__(self, conn: "Connection", as_dict: bool):
+        self.conn = conn
+        self.as_dict = as_dict
+        self.description: Optional[List[tuple]] = None
+        self._rows: List[tuple] = []
+
+    # -- Ergebnis setzen --
+    def _set(self, cols: List[str], rows: List[tuple]):
+        self.description = [(c, 1, None, None, None, None, None) for c in cols]
+        self._rows = [dict(zip(cols, r)) for r in rows] if self.as_dict else rows
+
+    def execute(self, sql: str, params: Any = None):
+        if self.conn.closed: raise InterfaceError("Connection is closed.")
+        rng = random.Random(zlib.crc32(sql.encode("utf-8")) ^ int(config["seed"]))
+        with _stats_lock: stats["statements"] += 1
+        if config["error_rate"] and random.random() < float(config["error_rate"]):
+            with _stats_lock: stats["errors"] += 1
+            code = int(config["error_code"])
+            raise OperationalError(code, f"Injected error {code}".encode())
+        self._dispatch(sql, params, rng)
+        time.sleep((float(config["query_ms"]) + len(self._rows) * float(config["row_us"]) / 1000) / 1000)
+        with _stats_lock: stats["rows"] += len(self._rows)
+
+    def _dispatch(self, sql: str, params: Any, rng: random.Random):
+        low = sql.lower()
+        n_rows = int(config["table_rows"])
+        if low.lstrip().startswith("set "):
+            self.description, self._rows = None, []; return
+        if "from sys.tables" in low:
+            md = datetime.datetime(2024, 1, 1)
+            return self._set(["schema", "name", "modify_date"], [(s, t, md) for s, t in table_names()])
+        if "is_primary_key" in low:
+            return self._set(["schema", "name", "column"], [(s, t, "No_") for s, t in table_names()])
+        if "min_active_rowversion" in low:
+            return self._set([""], [(int(config["rowversion"]).to_bytes(8, "big"),)])
+        if "change_tracking_tables" in low:
+            return self._set([""], [(0,)])
+        if "from sys.objects" in low:
+            return self._set(["n", "modify_date"], [(len(table_names()), datetime.datetime(2024, 1, 1))])
+        if "information_schema.columns" in low:
+            wanted = None
+            if params: wanted = (params[0], params[1])
+            rows = []
+            for s, t in table_names():
+                if wanted and (s, t) != wanted: continue
+                for pos, (c, dt, ml) in enumerate(COLUMNS, 1):
+                    rows.append((s, t, c, dt, "YES", ml, pos) if "table_schema, table_name" in low
+                                else (c, dt, "YES", ml, pos))
+            cols = (["TABLE_SCHEMA", "TABLE_NAME"] if "table_schema, table_name" in low else []) + \
+                   ["COLUMN_NAME", "DATA_TYPE", "IS_NULLABLE", "CHARACTER_MAXIMUM_LENGTH", "ORDINAL_POSITION"]
+            return self._set(cols, rows)
+        if "information_schema.tables" in low:
+            return self._set(["name"], [(f"{s}.{t}",) for s, t in table_names()])
+        if "extended_properties" in low:
+            return self._set(["s", "t", "c", "d"], [])
+        if "dm_db_stats_properties" in low:
+            md = datetime.datetime(2024, 1, 1)
+            return self._set(["stats_id", "name", "column", "last_updated", "rows", "rows_sampled", "steps", "mods"],
+                             [(1, "PK", "No_", md, n_rows, n_rows, 200, 0)])
+        if "dm_db_stats_histogram" in low:
+            step = max(1, n_rows // 200)
+            return self._set(["stats_id", "step", "key", "range_rows", "eq_rows", "distinct_range_rows"],
+                             [(1, i, f"K{i * step:06d}", step - 1, 1, step - 1) for i in range(1, 201)])
+        if "dm_db_partition_stats" in low or "dm_db_index_operational_stats" in low:
+            return self._set(["rows", "mods"], [(n_rows, 0)])
+        if "allocation_units" in low:
+            return self._set(["pages", "rows"], [(max(1, n_rows // 40), n_rows)])
+        if "count_big(*), count_big(" in low:
+            return self._set(["n", "nn", "d", "mn", "mx"], [(n_rows, n_rows - n_rows // 10, n_rows // 3, "A00000", "M99999")])
+        if re.search(r"select\s+count(?:_big)?\(\*\)", low):
+            return self._set([""], [(n_rows,)])
+        if "group by" in low:
+            k = self._limit(low, 10)
+            return self._set(["value", "cnt"], [(f"V{i}", n_rows // (i + 2)) for i in range(k)])
+        return self._select(sql, rng)
+
+    @staticmethod
+    def _limit(low: str, default: int) -> int:
+        m = _fetch_rx.search(low) or _top_rx.search(low)
+        return int(m.group(1)) if m else default
+
+    @staticmethod
+    def _split(proj: str) -> List[str]:
+        """Kommas nur auf oberster Klammerebene trennen (SUBSTRING(x, 1, n) bleibt ein Ausdruck)."""
+        parts, depth, cur = [], 0, ""
+        for ch in proj:
+            if ch == "," and depth == 0: parts.append(cur.strip()); cur = ""; continue
+            depth += (ch == "(") - (ch == ")")
+            cur += ch
+        return parts + [cur.strip()]
+
+    def _select(self, sql: str, rng: random.Random):
+        low = sql.lower()
+        n = min(self._limit(low, int(config["table_rows"])), int(config["table_rows"]))
+        if " where " in low and "%s" in low: n = min(n, 1)   # Zugriff über Schlüssel
+        if re.search(r"\]\s*>=\s*0x", low): n = min(n, int(config["changed_rows"]))   # rowversion-Delta
+        m = _proj_rx.search(sql)
+        proj = m.group(1).strip() if m else "*"
+        by_name = {c.lower(): (c, dt, ml) for c, dt, ml in COLUMNS}
+        cols, cut = (list(COLUMNS), {}) if proj == "*" else ([], {})
+        if proj != "*":
+            for part in self._split(proj):
+                alias = re.search(r"\bas\s+\[?([^\]]+)\]?\s*$", part, re.I)
+                func = re.match(r"(datalength|substring)\(\s*(?:cast\(\s*)?\[?([^\],]+)\]?(.*)", part, re.I)
+                inner = by_name.get(func.group(2).lower(), (func.group(2), "int", None)) if func else None
+                name = (alias.group(1) if alias else (inner[0] if func else part)).strip("[] ")
+                if func and func.group(1).lower() == "datalength":
+                    cols.append((name, "datalength", None))
+                elif func:
+                    cols.append((name, inner[1], inner[2]))
+                    length = re.search(r",\s*\d+\s*,\s*(\d+)\s*\)", func.group(3))
+                    if length: cut[len(cols) - 1] = int(length.group(1))
+                else:
+                    cols.append(by_name.get(name.lower(), (name, "int", None)))
+        rows = [tuple(_value(rng, dt, ml, i)[:cut[j]] if j in cut else _value(rng, dt, ml, i)
+                      for j, (_, dt, ml) in enumerate(cols)) for i in range(n)]
+        self._set([c for c, _, _ in cols], rows)
+
+    def fetchall(self): rows, self._rows = self._rows, []; return rows
+    def fetchone(self): return self._rows.pop(0) if self._rows else None
+    def close(self): pass
+
+
+class Connection:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        time.sleep(float(config["connect_ms"]) / 1000)
+        with _stats_lock: stats["connects"] += 1
+
+    def cursor(self, as_dict: bool = False): return Cursor(self, as_dict)
+    def commit(self): pass
+    def rollback(self):
+        if self.closed: raise InterfaceError("Connection is closed.")
+    def close(self): self.closed = True
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+
+def connect(**kwargs) -> Connection:
+    return Connection(**kwargs)
+
+
+def configure(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    config.clear(); config.update(DEFAULTS)
+    env = os.getenv("MSSQL_FAKE_CONFIG")
+    if env: config.update(json.loads(env))
+    if overrides: config.update(overrides)
+    return config
+
+
+def install(overrides: Optional[Dict[str, Any]] = None):
+    """Registriert den Fake als `pymssql` und ersetzt `_connect` im Server-Modul."""
+    configure(overrides)
+    sys.modules["pymssql"] = sys.modules[__name__]
+    from mssql_mcp_server import server
+    server._connect = lambda: connect(server="fake", database=server._t().database)
+    return server
@@ -0,0 +1,138 @@
+# benchmarks/replay.py
+"""
+Spielt einen Mitschnitt (RECORD_PATH, siehe mssql_mcp_server/recorder.py) gegen den Server
+mit Fake-Backend ab und vergleicht Konfigurationen.
+
+  python -m benchmarks.replay traffic.jsonl
+  python -m benchmarks.replay traffic.jsonl --speed 10 \\
+      --config base: --config nopool:POOL_SIZE=0 --config slowdb:@query_ms=20
+
+--speed   1 = Originaltempo, 10 = zehnfach beschleunigt, 0 = so schnell wie möglich (sequentiell)
+--config  NAME:KEY=VAL,...  Server-ENV je Konfiguration; Schlüssel mit '@' gehen an das Fake-Backend
+Jede Konfiguration läuft in einem eigenen Prozess (frische Caches/Pools).
+"""
+import argparse, json, os, subprocess, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path: sys.path.insert(0, ROOT)
+
+from benchmarks.bench import BENCH_ENV, percentile, _parse_kv
+
+
+def _dist(ms: List[float]) -> Dict[str, Any]:
+    ms = sorted(ms)
+    if not ms: return {"n": 0}
+    return {"n": len(ms), "mean_ms": round(sum(ms) / len(ms), 3), "p50_ms": round(percentile(ms, 50), 3),
+            "p90_ms": round(percentile(ms, 90), 3), "p99_ms": round(percentile(ms, 99), 3),
+            "max_ms": round(ms[-1], 3)}
+
+
+def _tool_of(rec: Dict[str, Any]) -> str:
+    req = rec["req"]
+    if rec.get("tr") == "mcp":
+        m = req.get("method")
+        return f"mcp:{(req.get('params') or {}).get('name')}" if m == "tools/call" else f"mcp:{m}"
+    return req.get("action") or "tools"
+
+
+def worker(path: str, speed: float, workers: int) -> Dict[str, Any]:
+    """Läuft im Subprozess: Fake installieren, Mitschnitt abspielen, Kennzahlen als JSON liefern."""
+    from benchmarks import fake_pymssql
+    server = fake_pymssql.install()
+    import mcp_server
+    mcp = mcp_server.MCPServer()
+
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(l) for l in f if l.strip()]
+    records.sort(key=lambda r: r["t"])
+
+    lat: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def play(i_rec: Tuple[int, Dict[str, Any]]):
+        i, rec = i_rec
+        req = dict(rec["req"])
+        t = time.perf_counter()
+        if rec.get("tr") == "mcp":
+            resp = mcp.handle_request({"jsonrpc": "2.0", "id": i + 1, **req})
+            ok = "error" not in resp
+        else:
+            resp = server._handle(req, transport=rec.get("tr") or "stdio")
+            ok = bool(resp.get("ok"))
+        d = (time.perf_counter() - t) * 1000
+        name = _tool_of(rec)
+        with lock:
+            lat.setdefault(name, []).append(d)
+            if not ok: errors[name] = errors.get(name, 0) + 1
+
+    t0 = time.perf_counter()
+    if speed <= 0:
+        for item in enumerate(records): play(item)
+    else:
+        base = records[0]["t"] if records else 0.0
+        with ThreadPoolExecutor(max(1, workers)) as ex:
+            for item in enumerate(records):
+                due = (item[1]["t"] - base) / speed - (time.perf_counter() - t0)
+                if due > 0: time.sleep(due)
+                ex.submit(play, item)
+    wall = time.perf_counter() - t0
+
+    all_ms = [x for v in lat.values() for x in v]
+    return {
+        "requests": len(records), "wall_s": round(wall, 3), "errors": sum(errors.values()),
+        "latency": _dist(all_ms),
+        "recorded": _dist([r["ms"] for r in records if "ms" in r]),
+        "per_tool": {k: {**_dist(v), "errors": errors.get(k, 0)} for k, v in sorted(lat.items())},
+        "caches": server.cache_stats(),
+        "backend": dict(fake_pymssql.stats),
+    }
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("log")
+    ap.add_argument("--speed", type=float, default=0.0)
+    ap.add_argument("--workers", type=int, default=8, help="parallele Requests bei --speed > 0")
+    ap.add_argument("--config", action="append", default=[], metavar="NAME:KEY=VAL,...")
+    ap.add_argument("--fake", default="", help="Fake-Backend für alle Konfigurationen")
+    ap.add_argument("--out", help="Ergebnisse als JSON schreiben")
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.worker:
+        json.dump(worker(args.log, args.speed, args.workers), sys.stdout)
+        return 0
+
+    configs = args.config or ["default:"]
+    results: Dict[str, Any] = {}
+    for spec in configs:
+        name, _, kv = spec.partition(":")
+        opts = _parse_kv(kv)
+        fake = {**_parse_kv(args.fake), **{k[1:]: v for k, v in opts.items() if k.startswith("@")}}
+        env = {**os.environ, **BENCH_ENV, "RECORD_PATH": "", "PYTHONPATH": ROOT,
+               **{k: str(v) for k, v in opts.items() if not k.startswith("@")},
+               "MSSQL_FAKE_CONFIG": json.dumps(fake)}
+        out = subprocess.run([sys.executable, "-m", "benchmarks.replay", os.path.abspath(args.log), "--worker",
+                              "--speed", str(args.speed), "--workers", str(args.workers)],
+                             cwd=ROOT, env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(out.stderr, file=sys.stderr); return out.returncode
+        results[name or "default"] = json.loads(out.stdout)
+
+    print(f"{'config':12} {'n':>6} {'err':>4} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'connects':>8}  cache hit rates")
+    for name, r in results.items():
+        l = r["latency"]
+        hits = " ".join(f"{k}={v['hit_rate']}" for k, v in r["caches"].items()
+                        if isinstance(v, dict) and v.get("hit_rate") is not None)
+        print(f"{name:12} {l.get('n', 0):>6} {r['errors']:>4} {l.get('p50_ms', 0):>8} {l.get('p90_ms', 0):>8} "
+              f"{l.get('p99_ms', 0):>8} {l.get('max_ms', 0):>8} {r['backend']['connects']:>8}  {hits or '-'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: json.dump(results, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+# benchmarks/serve.py
+"""
+Startet einen Transport mit Fake-Backend (siehe fake_pymssql.py).
+
+  python -m benchmarks.serve stdio            # mssql_mcp_server.server.run_stdio
+  python -m benchmarks.serve mcp              # mcp_server.run_mcp_server
+  python -m benchmarks.serve http --port 8765 # mssql_mcp_server.http:app unter uvicorn
+  python -m benchmarks.serve http --workers 4 # dito über mssql_mcp_server.serve (mehrere Prozesse)
+
+Die Fake-Konfiguration kommt aus MSSQL_FAKE_CONFIG (JSON).
+"""
+import argparse, os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path: sys.path.insert(0, ROOT)
+
+from benchmarks import fake_pymssql
+
+
+def fake_http_app():
+    """App-Factory für Worker-Prozesse: jeder installiert das Fake-Backend selbst."""
+    fake_pymssql.install()
+    from mssql_mcp_server.http import app
+    return app
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("transport", choices=["stdio", "mcp", "http"])
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    if args.transport == "http" and args.workers > 1:
+        from mssql_mcp_server import serve
+        return serve.main(["--host", "127.0.0.1", "--port", str(args.port), "--workers", str(args.workers),
+                           "--app", "benchmarks.serve:fake_http_app", "--factory"])
+    server = fake_pymssql.install()
+    if args.transport == "stdio":
+        server.run_stdio()
+    elif args.transport == "mcp":
+        import mcp_server
+        mcp_server.run_mcp_server()
+    else:
+        import uvicorn
+        from mssql_mcp_server.http import app
+        uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,19 @@ MCP-kompatibler STDIO-Server für LM Studio, Jan & OpenWebUI.
 - Notifications (ohne id) werden NICHT beantwortet.
 """
 
+import time
+
+_T_START = time.perf_counter()
+
 import sys
 import os
 import json
 import logging
-from dotenv import load_dotenv
+import threading
 
 # ===== Env & Logging =====
-load_dotenv()
+# .env wird erst mit den Tool-Implementierungen geladen (lazy, siehe _server()),
+# damit initialize/tools/list ohne pymssql/pydantic beantwortet werden (tools/list liest höchstens MSSQL_TARGETS).
 logging.basicConfig(
     stream=sys.stderr,
     level=os.getenv("LOG_LEVEL", "INFO"),
@@ -26,21 +31,73 @@ os.environ.setdefault("NO_COLOR", "1")
 if hasattr(sys.stdout, "reconfigure"):
     sys.stdout.reconfigure(encoding="utf-8", line_buffering=True)
 
-# ===== Tool-Implementierungen =====
-from mssql_mcp_server.server import (
-    tool_tables,
-    tool_columns,
-    tool_query,
-    tool_sample,
-    tool_stats,
-    tool_explain,
-    # (tool_paginate, tool_columns_with_examples optional)
-)
+from mssql_mcp_server.recorder import Recorder  # leichtgewichtig, zieht server.py nicht nach
+from mssql_mcp_server.render import BYTES_PER_TOKEN, render_rows
+from mssql_mcp_server import tracing
+
+# ===== Tool-Implementierungen (lazy) =====
+_server_mod = None
+_server_lock = threading.Lock()
+
+
+def _server():
+    """Importiert mssql_mcp_server.server (pymssql, pydantic, dotenv) beim ersten Bedarf."""
+    global _server_mod
+    if _server_mod is None:
+        with _server_lock:
+            if _server_mod is None:
+                t0 = time.perf_counter()
+                from mssql_mcp_server import server
+
+                logging.getLogger().setLevel(os.getenv("LOG_LEVEL", "INFO"))  # nach .env
+                logging.info(
+                    "tools imported in %dms", int((time.perf_counter() - t0) * 1000)
+                )
+                _server_mod = server
+    return _server_mod
+
+
+def _multi_target() -> bool:
+    """Wie server.py (`len(TARGETS) > 1`), ohne den Server zu importieren: Prozess-ENV, sonst nur .env lesen."""
+    if _server_mod is not None:
+        return len(_server_mod.TARGETS) > 1
+    raw = os.getenv("MSSQL_TARGETS")
+    if raw is None:
+        from dotenv import dotenv_values, find_dotenv  # klein; pymssql/pydantic bleiben lazy
+
+        raw = dotenv_values(find_dotenv()).get("MSSQL_TARGETS") or ""
+    return len([t for t in raw.split(",") if t.strip()]) > 1
+
+
+_TABULAR = ("query", "paginate", "sample", "stats", "watch", "columns_with_examples")
+_RENDER_PROPS = {
+    "format": {"type": "string", "enum": ["table", "csv"], "description": "Text layout of result rows"},
+    "max_tokens": {"type": "integer", "description": "Approximate token budget for the rendered rows"},
+}
 
 
 class MCPServer:
+    def __init__(self):
+        self._first_call = True
+        self._warmup_started = False
+        self._recorder = Recorder()  # RECORD_PATH aus der Prozess-Umgebung
+
+    def start_warmup(self):
+        """Nach dem Handshake: Tools importieren, Pool + Katalog im Hintergrund vorladen."""
+        if self._warmup_started:
+            return
+        self._warmup_started = True
+
+        def _run():
+            try:
+                _server().start_warmup()
+            except Exception:
+                logging.exception("warmup failed")
+
+        threading.Thread(target=_run, name="mcp-warmup", daemon=True).start()
+
     def _tools_spec(self):
-        return [
+        tools = [
             {
                 "name": "tables",
                 "description": "List all available tables",
@@ -64,14 +121,43 @@ class MCPServer:
                     "required": ["sql"],
                 },
             },
+            {
+                "name": "paginate",
+                "description": "Fetch one page of a query result (OFFSET/FETCH); use when a query is truncated",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "sql": {"type": "string"},
+                        "offset": {"type": "integer", "default": 0},
+                        "fetch": {"type": "integer", "default": 100},
+                    },
+                    "required": ["sql"],
+                },
+            },
+            {
+                "name": "columns_with_examples",
+                "description": "Column types plus a few distinct example values per column",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string"},
+                        "n": {"type": "integer", "default": 5},
+                    },
+                    "required": ["table"],
+                },
+            },
             {
                 "name": "sample",
-                "description": "Get sample data from a table",
+                "description": "Get sample data from a table (first rows or a reproducible random sample)",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
                         "table": {"type": "string"},
                         "n": {"type": "integer", "default": 50},
+                        "mode": {"type": "string", "enum": ["top", "random"], "default": "top"},
+                        "seed": {"type": "integer"},
+                        "columns": {"type": "array", "items": {"type": "string"}},
+                        "max_pages": {"type": "integer"},
                     },
                     "required": ["table"],
                 },
@@ -97,13 +183,318 @@ class MCPServer:
                     "required": ["sql"],
                 },
             },
+            {
+                "name": "search_schema",
+                "description": "Search table and column names (and descriptions) by keywords",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "q": {"type": "string"},
+                        "limit": {"type": "integer", "default": 20},
+                        "kind": {"type": "string", "enum": ["table", "column"]},
+                    },
+                    "required": ["q"],
+                },
+            },
+            {
+                "name": "profile_column",
+                "description": "Profile a column: top values, null ratio, distinct estimate, min/max",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string"},
+                        "column": {"type": "string"},
+                        "top_k": {"type": "integer", "default": 10},
+                        "sample_pct": {"type": "number"},
+                        "seed": {"type": "integer"},
+                    },
+                    "required": ["table", "column"],
+                },
+            },
+            {
+                "name": "column_stats",
+                "description": "Per-column range, density, distinct estimate and representative values "
+                "from index statistics (no table scan)",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string"},
+                        "top_k": {"type": "integer", "default": 5},
+                        "sample_rows": {"type": "integer", "default": 1000},
+                    },
+                    "required": ["table"],
+                },
+            },
+            {
+                "name": "watch",
+                "description": "Re-check a single-table result; only changed rows are fetched "
+                "(rowversion / Change Tracking) and 'changed' tells whether anything differs",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string"},
+                        "columns": {"type": "array", "items": {"type": "string"}},
+                        "where": {"type": "string"},
+                    },
+                    "required": ["table"],
+                },
+            },
+            {
+                "name": "fetch_blob",
+                "description": "Read a large binary/text value (deferred by query/sample) in chunks by primary key",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "table": {"type": "string"},
+                        "column": {"type": "string"},
+                        "key": {
+                            "description": "Primary key: object {column: value}, or the value for single-column keys"
+                        },
+                        "offset": {"type": "integer", "default": 0},
+                        "length": {"type": "integer"},
+                    },
+                    "required": ["table", "column", "key"],
+                },
+            },
         ]
+        # Tabellarische Ausgabe: Format und Budget je Aufruf überschreibbar
+        for tool in tools:
+            if tool["name"] in _TABULAR:
+                tool["inputSchema"]["properties"].update(_RENDER_PROPS)
+        # Mehrere Ziele (MSSQL_TARGETS): jedes Tool nimmt optional den Zielnamen
+        if _multi_target():
+            for tool in tools:
+                tool["inputSchema"]["properties"]["target"] = {
+                    "type": "string",
+                    "description": "Target name from MSSQL_TARGETS (optional; 'target:table' also works)",
+                }
+        return tools
+
+    def _rows_text(self, rows, columns, args: dict, max_cell: int = None) -> str:
+        """Ergebnistabelle im Budget: MCP_MAX_TOKENS / MCP_TABLE_FORMAT / MCP_CELL_CHARS bzw. je Aufruf."""
+        fmt = args.get("format") or os.getenv("MCP_TABLE_FORMAT", "table")
+        tokens = int(args.get("max_tokens") or os.getenv("MCP_MAX_TOKENS", "2000"))
+        with tracing.phase("render"):
+            text, _ = render_rows(
+                rows,
+                columns,
+                fmt,
+                max(tokens, 50) * BYTES_PER_TOKEN,
+                max_cell if max_cell is not None else int(os.getenv("MCP_CELL_CHARS", "60")),
+            )
+        return text
+
+    def _call_tool(self, srv, tool_name: str, tool_args: dict):
+        """Führt ein Tool aus; liefert (Text, strukturierte Daten) oder None bei unbekanntem Tool."""
+        target, tool_args = srv._route(tool_args)
+        with srv.use_target(target):
+            srv._annotate_trace()
+            if tool_name == "tables":
+                result = srv.tool_tables()
+                data = {"tables": result}
+                text = f"Available tables ({len(result)}):\n" + "\n".join(result)
+
+            elif tool_name == "columns":
+                tbl = tool_args["table"]
+                cols = srv.tool_columns(tbl)
+                data = {"table": tbl, "columns": cols}
+                parts = []
+                for col in cols:
+                    s = f"{col['column']}:{col['type']}"
+                    if col.get("max_len"):
+                        s += f"({col['max_len']})"
+                    if col.get("nullable"):
+                        s += "?"
+                    parts.append(s)
+                text = f"Columns for '{tbl}' ({len(cols)}): " + " | ".join(parts)
+
+            elif tool_name == "columns_with_examples":
+                tbl = tool_args["table"]
+                data = srv.tool_columns_with_examples(tbl, int(tool_args.get("n", 5)))
+                rows = [
+                    {
+                        "column": col["column"],
+                        "type": col["type"] + (f"({col['max_len']})" if col.get("max_len") else ""),
+                        "examples": ", ".join(str(v) for v in data["examples"].get(col["column"], [])),
+                    }
+                    for col in data["columns"]
+                ]
+                text = f"Columns with examples for '{tbl}' ({len(rows)}):\n"
+                text += self._rows_text(rows, ["column", "type", "examples"], tool_args, max_cell=120)
+
+            elif tool_name in ("query", "paginate"):
+                if tool_name == "query":
+                    res = srv.tool_query(tool_args["sql"])
+                else:
+                    offset = int(tool_args.get("offset", 0))
+                    res = srv.tool_paginate(tool_args["sql"], offset, int(tool_args.get("fetch", 100)))
+                data = res.model_dump()
+                head = f"Query executed: {res.row_count} rows"
+                if tool_name == "paginate":
+                    head = f"Page at offset {offset}: {res.row_count} rows"
+                if res.truncated:
+                    head += " (truncated)"
+                lines = [head + f" in {res.execution_ms}ms"]
+                if res.deferred:
+                    lines.append(f"Deferred LOB columns (use fetch_blob): {', '.join(res.deferred)}")
+                if res.rows:
+                    lines.append(self._rows_text(res.rows, res.columns, tool_args))
+                text = "\n".join(lines)
+
+            elif tool_name == "sample":
+                n = int(tool_args.get("n", 50))
+                tbl = tool_args["table"]
+                seed = tool_args.get("seed")
+                max_pages = tool_args.get("max_pages")
+                res = srv.tool_sample(
+                    tbl,
+                    n,
+                    tool_args.get("mode") or "top",
+                    int(seed) if seed is not None else None,
+                    tool_args.get("columns"),
+                    int(max_pages) if max_pages is not None else None,
+                )
+                data = res.model_dump()
+                head = f"Sample from '{tbl}': {min(len(res.rows or []), n)} rows"
+                if res.truncated:
+                    head += " (truncated)"
+                head += f" (total: {res.row_count})"
+                if res.sampling:
+                    head += f" [random, seed {res.sampling['seed']}, {res.sampling['method']}]"
+                lines = [head]
+                if res.deferred:
+                    lines.append(f"Deferred LOB columns (use fetch_blob): {', '.join(res.deferred)}")
+                if res.rows:
+                    lines.append(self._rows_text(res.rows, res.columns, tool_args))
+                text = "\n".join(lines)
+
+            elif tool_name == "stats":
+                tbl = tool_args["table"]
+                data = srv.tool_stats(tbl, int(tool_args.get("sample_n", 5)))
+                sample = data["sample"]
+                text = f"Table '{tbl}' statistics:\nTotal rows: {data['row_count']}\n"
+                text += f"Sample rows: {len(sample['rows'])}\n"
+                if sample["rows"]:
+                    text += self._rows_text(sample["rows"], sample["columns"], tool_args)
+
+            elif tool_name == "explain":
+                data = srv.tool_explain(tool_args["sql"])
+                lines = [f"Query analysis: {'✅ Safe' if data['ok'] else '❌ Issues found'}"]
+                lines += [f"• {i['message']} ({i['severity']})" for i in data.get("issues") or []]
+                lines += [f"• {s}" for s in data.get("suggestions") or []]
+                text = "\n".join(lines)
+
+            elif tool_name == "search_schema":
+                data = srv.tool_search_schema(
+                    tool_args["q"], int(tool_args.get("limit", 20)), tool_args.get("kind")
+                )
+                lines = [f"Schema matches for '{data['query']}' ({len(data['results'])}):"]
+                for hit in data["results"]:
+                    name = hit["table"] + (f".{hit['column']}" if hit.get("column") else "")
+                    if hit.get("target"):
+                        name = f"{hit['target']}:{name}"
+                    lines.append(f"{hit['kind']}: {name} (score {hit['score']})")
+                text = "\n".join(lines)
+
+            elif tool_name == "profile_column":
+                pct = tool_args.get("sample_pct")
+                seed = tool_args.get("seed")
+                data = res = srv.tool_profile_column(
+                    tool_args["table"],
+                    tool_args["column"],
+                    int(tool_args.get("top_k", 10)),
+                    float(pct) if pct is not None else None,
+                    int(seed) if seed is not None else None,
+                )
+                head = f"Profile of '{res['table']}.{res['column']}' ({res['type']})"
+                if res["sampled"]:
+                    head += f", sampled {res['sample_pct']}%"
+                lines = [
+                    head + ":",
+                    f"Rows: {res['rows']}, nulls: {res['nulls']} ({res['null_ratio']})",
+                    f"Distinct ({res['distinct_method']}): {res['distinct_estimate']}",
+                    f"Min: {res['min']}, max: {res['max']}",
+                    "Top values:",
+                ]
+                lines += [f"{v['value']}: {v['count']}" for v in res["top_values"]]
+                text = "\n".join(lines)
+
+            elif tool_name == "column_stats":
+                tbl = tool_args["table"]
+                data = srv.tool_column_stats(
+                    tbl, int(tool_args.get("top_k", 5)), int(tool_args.get("sample_rows", 1000))
+                )
+                lines = [f"Column statistics for '{tbl}' ({len(data['columns'])} columns):"]
+                for col, st in data["columns"].items():
+                    if st["source"] == "skipped":
+                        lines.append(f"{col}: skipped ({st['reason']})")
+                        continue
+                    distinct = st.get("distinct_estimate", st.get("distinct_in_sample"))
+                    values = ", ".join(str(v["value"]) for v in st["representative_values"])
+                    lines.append(
+                        f"{col} [{st['source']}]: {st['min']} .. {st['max']}, "
+                        f"distinct ~{distinct}, nulls {st['null_ratio']}, e.g. {values}"
+                    )
+                text = "\n".join(lines)
+
+            elif tool_name == "watch":
+                tbl = tool_args["table"]
+                data = res = srv.tool_watch(tbl, tool_args.get("columns"), tool_args.get("where") or None)
+                rows = res["result"]["rows"]
+                head = f"Watch '{tbl}' [{res['mode']}]: "
+                if not res["changed"]:
+                    head += f"unchanged ({len(rows)} rows)"
+                else:
+                    head += f"changed, {res['upserted']} new/updated, {res['deleted']} removed, {len(rows)} rows"
+                if res["result"]["truncated"]:
+                    head += " (truncated)"
+                text = head
+                if res["changed"] and rows:
+                    text += "\n" + self._rows_text(rows, res["result"]["columns"], tool_args)
+
+            elif tool_name == "fetch_blob":
+                length = tool_args.get("length")
+                data = res = srv.tool_fetch_blob(
+                    tool_args["table"],
+                    tool_args["column"],
+                    tool_args["key"],
+                    int(tool_args.get("offset", 0)),
+                    int(length) if length is not None else None,
+                )
+                end = res["offset"] + res["length"]
+                text = (
+                    f"Value of '{res['table']}.{res['column']}' {res['offset']}..{end} "
+                    f"of {res['total']} {res['unit']}"
+                )
+                text += " (complete)" if res["done"] else f" (more: offset={end})"
+                if res["encoding"]:
+                    text += f", {res['encoding']}"
+                text += f":\n{res['data']}"
+
+            else:
+                return None
+        return text, data
 
     def handle_request(self, request: dict):
         """
         Verarbeitet JSON-RPC *Requests* (mit id).
         Notifications ohne id werden außerhalb abgefangen.
         """
+        if not self._recorder.enabled:
+            return self._dispatch(request)
+        started, t0 = time.time(), time.perf_counter()
+        resp = self._dispatch(request)
+        self._recorder.record(
+            "mcp",
+            {"method": request.get("method"), "params": request.get("params") or {}},
+            started,
+            (time.perf_counter() - t0) * 1000,
+            resp,
+            "error" not in resp,
+        )
+        return resp
+
+    def _dispatch(self, request: dict):
         try:
             method = request.get("method")
             params = request.get("params", {}) or {}
@@ -147,78 +538,48 @@ class MCPServer:
                 tool_name = params.get("name")
                 tool_args = params.get("arguments", {}) or {}
                 logging.info("tool_call name=%s args=%s", tool_name, tool_args)
+                t0 = time.perf_counter()
+                srv = _server()
+                if tool_args.get("format") not in (None, "", "table", "csv"):
+                    raise ValueError("Parameter 'format' muss 'table' oder 'csv' sein.")
 
-                if tool_name == "tables":
-                    result = tool_tables()
-                    text = f"Available tables ({len(result)}):\n" + "\n".join(result)
-
-                elif tool_name == "columns":
-                    tbl = tool_args["table"]
-                    cols = tool_columns(tbl)
-                    parts = []
-                    for col in cols:
-                        s = f"{col['column']}:{col['type']}"
-                        if col.get("max_len"):
-                            s += f"({col['max_len']})"
-                        if col.get("nullable"):
-                            s += "?"
-                        parts.append(s)
-                    text = f"Columns for '{tbl}' ({len(cols)}): " + " | ".join(parts)
-
-                elif tool_name == "query":
-                    res = tool_query(tool_args["sql"])
-                    text = f"Query executed: {res.row_count} rows"
-                    if getattr(res, "truncated", False):
-                        text += " (truncated)"
-                    text += f" in {res.execution_ms}ms\n\n"
-                    if res.rows:
-                        text += "Results:\n"
-                        for i, row in enumerate(res.rows):
-                            text += f"Row {i+1}: {dict(list(row.items())[:3])}\n"
-
-                elif tool_name == "sample":
-                    n = int(tool_args.get("n", 50))
-                    tbl = tool_args["table"]
-                    res = tool_sample(tbl, n)
-                    sample_size = min(len(res.rows or []), n)
-                    text = f"Sample from '{tbl}': {sample_size} rows"
-                    if getattr(res, "truncated", False):
-                        text += " (truncated)"
-                    text += f" (total: {res.row_count})\n\n"
-                    if res.rows:
-                        text += "Sample data:\n"
-                        for i, row in enumerate(res.rows):
-                            text += f"Row {i+1}: {dict(list(row.items())[:2])}\n"
-
-                elif tool_name == "stats":
-                    tbl = tool_args["table"]
-                    res = tool_stats(tbl, int(tool_args.get("sample_n", 5)))
-                    text = f"Table '{tbl}' statistics:\n"
-                    text += f"Total rows: {res['row_count']}\n"
-                    text += f"Sample rows: {len(res['sample']['rows'])}\n\n"
-                    for i, row in enumerate(res["sample"]["rows"][:3]):
-                        text += f"Row {i+1}: {dict(list(row.items())[:2])}\n"
-
-                elif tool_name == "explain":
-                    res = tool_explain(tool_args["sql"])
-                    text = f"Query analysis: {'✅ Safe' if res['ok'] else '❌ Issues found'}\n"
-                    if res.get("issues"):
-                        text += "".join(f"• {i['message']} ({i['severity']})\n" for i in res["issues"])
-                    if res.get("suggestions"):
-                        text += "".join(f"• {s}\n" for s in res["suggestions"])
-
-                else:
+                meta = params.get("_meta") or {}
+                trace = tracing.start(
+                    f"mcp.{tool_name}",
+                    meta.get("traceparent"),
+                    req_id,
+                    **{"mssql_mcp.action": tool_name, "mssql_mcp.transport": "mcp"},
+                )
+                try:
+                    out = self._call_tool(srv, tool_name, tool_args)
+                except Exception as e:
+                    tracing.finish(trace, False, str(e))
+                    raise
+                tr = tracing.finish(trace, out is not None, None if out else f"Unknown tool: {tool_name}")
+                if out is None:
                     return {
                         "jsonrpc": "2.0",
                         "id": req_id,
                         "error": {"code": -32601, "message": f"Unknown tool: {tool_name}"},
                     }
+                text, data = out
 
-                return {
-                    "jsonrpc": "2.0",
-                    "id": req_id,
-                    "result": {"content": [{"type": "text", "text": text}]},
-                }
+                if self._first_call:
+                    self._first_call = False
+                    logging.info(
+                        "first_call tool=%s ms=%d",
+                        tool_name,
+                        int((time.perf_counter() - t0) * 1000),
+                    )
+
+                result = {"content": [{"type": "text", "text": text}]}
+                # opt-in: structuredContent trägt alle Zeilen/Spalten ungekürzt; Clients, die es an das Modell
+                # weiterreichen, würden das Token-Budget des Texts sonst umgehen
+                if os.getenv("MCP_STRUCTURED", "false").lower() == "true":
+                    result["structuredContent"] = data
+                if os.getenv("TRACE_TIMING", "false").lower() == "true" or meta.get("timing"):
+                    result["_meta"] = {"trace": tr.summary()}
+                return {"jsonrpc": "2.0", "id": req_id, "result": result}
 
             # ---- Unbekannte Methode ----
             return {
@@ -237,7 +598,10 @@ class MCPServer:
 
 
 def run_mcp_server():
-    logging.info("mssql_mcp_server starting (MCP compliant)")
+    logging.info(
+        "mssql_mcp_server starting (MCP compliant), ready in %dms",
+        int((time.perf_counter() - _T_START) * 1000),
+    )
     server = MCPServer()
 
     for raw in sys.stdin:
@@ -271,6 +635,8 @@ def run_mcp_server():
         resp = server.handle_request(req)
         sys.stdout.write(json.dumps(resp, ensure_ascii=False) + "\n")
         sys.stdout.flush()
+        # Warm-up erst nach der ersten Antwort (typisch: initialize) anstoßen
+        server.start_warmup()
 
 
 if __name__ == "__main__":
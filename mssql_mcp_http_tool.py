@@ -1,9 +1,9 @@
 """
 title: MSSQL MCP (HTTP)
 author: You
-version: 1.0.4
+version: 1.0.6
 license: MIT
-description: Call MSSQL MCP over HTTP (tables, columns, query, paginate, explain, columns_with_examples, stats, value_counts, discover)
+description: Call MSSQL MCP over HTTP (tables, columns, query, paginate, explain, columns_with_examples, stats, value_counts, profile_column, column_stats, search_schema, watch, fetch_blob, discover)
 requirements: requests
 """
 
@@ -31,6 +31,10 @@ class Tools:
             default=100, description="Default FETCH size for paginate"
         )
         server_row_limit_hint: int = Field(default=500, description="Informative only")
+        target: str = Field(
+            default="",
+            description="Default target (MSSQL_TARGETS on the server); empty = server default / all targets",
+        )
 
     class UserValves(BaseModel):
         allow_tables: str = Field(
@@ -48,6 +52,8 @@ class Tools:
         return None
 
     def _call(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self.valves.target and "target" not in payload and ":" not in str(payload.get("table", "")):
+            payload = {**payload, "target": self.valves.target}
         r = requests.post(
             self.valves.mcp_url,
             json=payload,
@@ -104,6 +110,24 @@ class Tools:
     def query(self, sql: str, __user__: Any = None) -> Dict[str, Any]:
         return self._call({"action": "query", "sql": sql})
 
+    def sample(
+        self,
+        table: str,
+        n: int = 20,
+        mode: str = "top",
+        seed: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        __user__: Any = None,
+    ) -> Dict[str, Any]:
+        """Beispielzeilen wie die Server-Action: mode "top" (Standard) oder "random" (mit seed reproduzierbar)."""
+        self._check_table(table, __user__)
+        payload = {"action": "sample", "table": table, "n": int(n), "mode": mode}
+        if seed is not None:
+            payload["seed"] = int(seed)
+        if columns:
+            payload["columns"] = list(columns)
+        return self._call(payload)
+
     def paginate(
         self,
         sql: str,
@@ -135,6 +159,73 @@ class Tools:
             {"action": "stats", "table": table, "sample_n": int(sample_n)}
         )
 
+    def search_schema(
+        self, q: str, limit: int = 20, kind: Optional[str] = None, __user__: Any = None
+    ) -> Dict[str, Any]:
+        payload = {"action": "search_schema", "q": q, "limit": int(limit)}
+        if kind:
+            payload["kind"] = kind
+        return self._call(payload)
+
+    def profile_column(
+        self,
+        table: str,
+        column: str,
+        top_k: int = 10,
+        sample_pct: Optional[float] = None,
+        seed: Optional[int] = None,
+        __user__: Any = None,
+    ) -> Dict[str, Any]:
+        """Serverseitiges Spaltenprofil (Top-k, NULL-Anteil, Distinct, Min/Max) – gecacht."""
+        self._check_table(table, __user__)
+        payload = {"action": "profile_column", "table": table, "column": column, "top_k": int(top_k)}
+        if sample_pct is not None:
+            payload["sample_pct"] = float(sample_pct)
+        if seed is not None:
+            payload["seed"] = int(seed)
+        return self._call(payload)
+
+    def column_stats(
+        self, table: str, top_k: int = 5, sample_rows: int = 1000, __user__: Any = None
+    ) -> Dict[str, Any]:
+        """Spalten-Zusammenfassungen aus den Index-Statistiken (kein Scan der Tabelle)."""
+        self._check_table(table, __user__)
+        return self._call(
+            {"action": "column_stats", "table": table, "top_k": int(top_k), "sample_rows": int(sample_rows)}
+        )
+
+    def watch(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        where: Optional[str] = None,
+        __user__: Any = None,
+    ) -> Dict[str, Any]:
+        """Ergebnis einer Tabelle erneut prüfen; 'changed' sagt, ob sich seit dem letzten Aufruf etwas geändert hat."""
+        self._check_table(table, __user__)
+        payload = {"action": "watch", "table": table}
+        if columns:
+            payload["columns"] = list(columns)
+        if where:
+            payload["where"] = where
+        return self._call(payload)
+
+    def fetch_blob(
+        self,
+        table: str,
+        column: str,
+        key: Any,
+        offset: int = 0,
+        length: Optional[int] = None,
+        __user__: Any = None,
+    ) -> Dict[str, Any]:
+        """Liest einen zurückgestellten BLOB-/Textwert abschnittsweise über den Primärschlüssel."""
+        self._check_table(table, __user__)
+        payload = {"action": "fetch_blob", "table": table, "column": column, "key": key, "offset": int(offset)}
+        if length is not None:
+            payload["length"] = int(length)
+        return self._call(payload)
+
     # ---------------- Zusatz-APIs ----------------
 
     def value_counts(
@@ -147,48 +238,41 @@ class Tools:
         debug: bool = False,
     ) -> Dict[str, Any]:
         """
-        Häufigste Werte (z. B. Codes/Länder) – **ohne ORDER BY im inneren Select**.
-        Wir sortieren im äußeren Select (damit MCP.paginate OFFSET/FETCH anhängen kann),
-        und vermeiden so den SQL-Fehler in derived tables.
+        Häufigste Werte (z. B. Codes/Länder) über das serverseitige `profile_column`
+        (Top-k per GROUP BY auf dem Server, gecacht bis sich die Tabelle ändert).
+        NULL und leere Werte landen mit include_null_bucket im Bucket "∅", sonst entfallen sie.
         """
-        self._check_table(table, __user__)
-        tbl = f"[{table}]" if not re.search(r"[\[\]]", table) else table
-        col = f"[{column}]" if not re.search(r"[\[\]]", column) else column
-
-        if include_null_bucket:
-            inner = (
-                f"SELECT ISNULL(CAST(NULLIF(LTRIM(RTRIM({col})), '') AS NVARCHAR(100)), N'∅') AS value, "
-                f"       COUNT(*) AS cnt "
-                f"FROM {tbl} "
-                f"GROUP BY ISNULL(CAST(NULLIF(LTRIM(RTRIM({col})), '') AS NVARCHAR(100)), N'∅')"
-            )
-        else:
-            inner = (
-                f"SELECT CAST({col} AS NVARCHAR(100)) AS value, COUNT(*) AS cnt "
-                f"FROM {tbl} "
-                f"WHERE {col} IS NOT NULL AND LTRIM(RTRIM({col})) <> '' "
-                f"GROUP BY CAST({col} AS NVARCHAR(100))"
-            )
-
-        # WICHTIG: kein ORDER BY im inneren Select!
-        wrapped_ordered = f"SELECT * FROM (\n{inner}\n) AS _vc ORDER BY cnt DESC"
-
-        # Jetzt paginieren (MCP hängt OFFSET/FETCH an das äußere ORDER BY an)
-        res = self.paginate(
-            sql=wrapped_ordered, offset=0, fetch=int(top_k), __user__=__user__
-        )
+        # eine Gruppe mehr anfordern: NULL/leer kann unter den Top-k sein und wird hier umsortiert
+        prof = self.profile_column(table, column, top_k=int(top_k) + 1, __user__=__user__)
+        if not isinstance(prof, dict) or prof.get("ok") is False or "top_values" not in prof:
+            return prof
+
+        counts: Dict[Any, int] = {}
+        blank = int(prof.get("nulls") or 0)
+        for tv in prof["top_values"]:
+            v = tv.get("value")
+            if v is None:
+                continue  # steckt schon in "nulls"
+            if isinstance(v, str) and not v.strip():
+                blank += tv.get("count") or 0
+                continue
+            counts[v] = counts.get(v, 0) + (tv.get("count") or 0)
+        if include_null_bucket and blank:
+            counts["∅"] = counts.get("∅", 0) + blank
+        ranked = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[: int(top_k)]
 
         out = {
             "table": table,
             "column": column,
             "top_k": int(top_k),
-            "columns": res.get("columns", ["value", "cnt"]),
-            "rows": res.get("rows", []),
-            "row_count": res.get("row_count", 0),
-            "truncated": bool(res.get("truncated", False)),
+            "columns": ["value", "cnt"],
+            "rows": [{"value": v, "cnt": c} for v, c in ranked],
+            "row_count": len(ranked),
+            "truncated": len(counts) > int(top_k)
+            or (prof.get("distinct_estimate") or 0) > len(ranked),
         }
         if debug:
-            out["debug"] = {"wrapped_sql": wrapped_ordered}
+            out["debug"] = {k: v for k, v in prof.items() if k != "top_values"}
         return out
 
     def _maybe_sample(
@@ -208,14 +292,7 @@ class Tools:
         except Exception:
             return []
 
-    def discover(
-        self,
-        question: str,
-        max_tables: int = 2,
-        examples_per_col: int = 1,
-        slim: bool = True,
-        __user__: Any = None,
-    ) -> Dict[str, Any]:
+    def _rank_by_name(self, question: str, max_tables: int) -> List[str]:
         all_tables = self.tables()
 
         def _score(t: str) -> int:
@@ -230,10 +307,31 @@ class Tools:
         ranked = sorted(
             ((t, _score(t)) for t in all_tables), key=lambda x: x[1], reverse=True
         )
-        picked = [t for t, sc in ranked if sc > 0][:max_tables] or [
+        return [t for t, sc in ranked if sc > 0][:max_tables] or [
             t for t, _ in ranked[:max_tables]
         ]
 
+    def discover(
+        self,
+        question: str,
+        max_tables: int = 2,
+        examples_per_col: int = 1,
+        slim: bool = True,
+        __user__: Any = None,
+    ) -> Dict[str, Any]:
+        # Serverseitiger Schema-Index (Tabellen + Spalten); Fallback: Namensvergleich
+        hits = self.search_schema(question, limit=50)
+        if isinstance(hits, dict) and hits.get("results"):
+            # bei Suche über alle Ziele tragen Treffer "target" -> als "ziel:tabelle" weiterreichen
+            picked = list(
+                dict.fromkeys(
+                    f"{h['target']}:{h['table']}" if h.get("target") else h["table"]
+                    for h in hits["results"]
+                )
+            )[:max_tables]
+        else:
+            picked = self._rank_by_name(question, max_tables)
+
         details = []
         for t in picked:
             try:
@@ -0,0 +1,57 @@
+# mssql_mcp_server/cache.py
+"""
+Kleiner In-Memory-Cache mit Versionsprüfung.
+
+Ein Eintrag gilt, solange die mitgegebene Version (z. B. Änderungszähler einer Tabelle)
+unverändert ist. Ist keine Version ermittelbar (None), greift ersatzweise eine TTL.
+Begrenzung über max_entries (LRU).
+"""
+import threading, time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class VersionedCache:
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Any = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                ver, ts, value = entry
+                fresh = (ver == version) if version is not None else (time.time() - ts) <= self.ttl_s
+                if fresh and (version is not None or ver is None):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def peek(self, key: Hashable) -> Optional[tuple]:
+        """(Version, Wert) ohne Versions-/TTL-Prüfung und ohne Statistik – Basis für inkrementelle Updates."""
+        with self._lock:
+            entry = self._data.get(key)
+            return (entry[0], entry[2]) if entry is not None else None
+
+    def put(self, key: Hashable, version: Any, value: Any):
+        with self._lock:
+            self._data[key] = (version, time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._data),
+                "hit_rate": round(self.hits / total, 4) if total else None}
@@ -0,0 +1,279 @@
+# mssql_mcp_server/catalog.py
+"""
+Schema-Katalog + invertierter Index über Tabellen-, Spalten- und Beschreibungs-Namen.
+
+- Tokenisierung an `$`, `_`, Leerzeichen, Satzzeichen, camelCase und Ziffern-Grenzen
+  ("CRONUS AG$Sales Header" -> cronus, ag, sales, header; "VATAmount" -> vat, amount).
+- Inkrementelle Pflege: nur Tabellen mit geändertem `modify_date` werden neu gelesen.
+- Suche ist rein in-memory (Dict-Lookups + bisect für Präfixe) -> Sub-Millisekunden.
+"""
+import bisect, math, threading, time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Gewichte je Feld: Namenstreffer zählen mehr als Beschreibungstreffer
+_W_NAME = 1.0
+_W_DESC = 0.4
+_W_PREFIX = 0.5   # Präfix-Treffer ("cust" -> "customer") zählen halb
+_MIN_PREFIX = 3
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Zerlegt Bezeichner in kleingeschriebene Tokens (camelCase-, Ziffern- und Trennzeichen-Grenzen)."""
+    if not text: return []
+    tokens: List[str] = []
+    cur: List[str] = []
+
+    def flush():
+        if cur: tokens.append("".join(cur).lower()); cur.clear()
+
+    n = len(text)
+    for i, ch in enumerate(text):
+        if not ch.isalnum():
+            flush(); continue
+        if cur:
+            prev = cur[-1]
+            if ch.isdigit() != prev.isdigit():
+                flush()
+            elif ch.isupper() and prev.islower():
+                flush()                                   # "salesHeader" -> sales | header
+            elif ch.isupper() and prev.isupper() and i + 1 < n and text[i + 1].islower():
+                flush()                                   # "VATAmount" -> vat | amount
+        cur.append(ch)
+    flush()
+    return tokens
+
+
+def _stamp(v: Any) -> str:
+    return v.isoformat() if hasattr(v, "isoformat") else str(v)
+
+
+class SchemaIndex:
+    """Invertierter Index: Token -> {doc_id: Gewicht}. Docs sind Tabellen und Spalten."""
+
+    def __init__(self):
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_tokens: Dict[int, List[str]] = {}
+        self._vocab: List[str] = []                       # sortiert, für Präfixsuche
+        self._by_table: Dict[str, List[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ---- Pflege ----
+    def _add_doc(self, doc: Dict[str, Any], name_text: str, desc_text: Optional[str]):
+        did = self._next_id; self._next_id += 1
+        self._docs[did] = doc
+        weights: Dict[str, float] = {}
+        for tok in tokenize(name_text):
+            weights[tok] = max(weights.get(tok, 0.0), _W_NAME)
+        for tok in tokenize(desc_text):
+            weights[tok] = max(weights.get(tok, 0.0), _W_DESC)
+        for tok, w in weights.items():
+            post = self._postings.get(tok)
+            if post is None:
+                post = self._postings[tok] = {}
+                bisect.insort(self._vocab, tok)
+            post[did] = w
+        self._doc_tokens[did] = list(weights)
+        self._by_table.setdefault(doc["table"], []).append(did)
+
+    def remove_table(self, table: str):
+        for did in self._by_table.pop(table, []):
+            self._docs.pop(did, None)
+            for tok in self._doc_tokens.pop(did, []):
+                post = self._postings[tok]
+                post.pop(did, None)
+                if not post:
+                    del self._postings[tok]
+                    i = bisect.bisect_left(self._vocab, tok)
+                    if i < len(self._vocab) and self._vocab[i] == tok: del self._vocab[i]
+
+    def upsert_table(self, table: str, columns: Iterable[Dict[str, Any]], description: Optional[str] = None):
+        """Ersetzt alle Docs einer Tabelle (Tabelle selbst + Spalten)."""
+        self.remove_table(table)
+        name = table.split(".", 1)[1] if "." in table else table
+        self._add_doc({"kind": "table", "table": table, "description": description}, name, description)
+        for c in columns:
+            self._add_doc({"kind": "column", "table": table, "column": c["column"],
+                           "type": c.get("type"), "description": c.get("description")},
+                          c["column"], c.get("description"))
+
+    # ---- Suche ----
+    def _expand(self, tok: str) -> List[Tuple[str, float]]:
+        out = [(tok, 1.0)] if tok in self._postings else []
+        if len(tok) >= _MIN_PREFIX:
+            i = bisect.bisect_left(self._vocab, tok)
+            while i < len(self._vocab) and self._vocab[i].startswith(tok):
+                if self._vocab[i] != tok: out.append((self._vocab[i], _W_PREFIX))
+                i += 1
+        return out
+
+    def search(self, query: str, limit: int = 20, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        q_tokens = list(dict.fromkeys(tokenize(query)))
+        if not q_tokens or not self._docs: return []
+        n_docs = len(self._docs)
+        scores: Dict[int, float] = {}
+        matched: Dict[int, Set[str]] = {}
+        for qt in q_tokens:
+            for tok, factor in self._expand(qt):
+                post = self._postings[tok]
+                idf = math.log(1.0 + n_docs / len(post))
+                for did, w in post.items():
+                    scores[did] = scores.get(did, 0.0) + idf * w * factor
+                    matched.setdefault(did, set()).add(qt)
+        results = []
+        for did, sc in scores.items():
+            doc = self._docs[did]
+            if kind and doc["kind"] != kind: continue
+            coverage = len(matched[did]) / len(q_tokens)
+            results.append((sc * coverage, did))
+        results.sort(key=lambda x: (-x[0], x[1]))
+        out = []
+        for sc, did in results[:max(1, limit)]:
+            doc = {k: v for k, v in self._docs[did].items() if v is not None}
+            doc["score"] = round(sc, 4)
+            doc["matched"] = sorted(matched[did])
+            out.append(doc)
+        return out
+
+
+class SchemaCatalog:
+    """
+    Gecachter Katalog (Tabellen -> Spalten-Metadaten) inkl. Suchindex.
+    `refresh()` liest `sys.tables.modify_date` und lädt nur geänderte Tabellen nach.
+    """
+
+    def __init__(self, is_allowed: Callable[[str], bool] = lambda t: True):
+        self.is_allowed = is_allowed
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.index = SchemaIndex()
+        self.loaded_at = 0.0
+        self._lock = threading.RLock()
+
+    def columns(self, table: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self.tables.get(table) or self.tables.get(f"dbo.{table}")
+        return entry["columns"] if entry else None
+
+    def primary_key(self, table: str) -> Optional[List[str]]:
+        entry = self.tables.get(table) or self.tables.get(f"dbo.{table}")
+        return entry.get("primary_key") if entry else None
+
+    def is_stale(self, max_age_s: float) -> bool:
+        return (time.time() - self.loaded_at) > max_age_s
+
+    def refresh(self, conn) -> Dict[str, int]:
+        """Gleicht den Katalog mit der DB ab. Liefert Anzahl neu geladener/entfernter Tabellen."""
+        with self._lock:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT s.name, t.name, t.modify_date
+                FROM sys.tables t JOIN sys.schemas s ON s.schema_id = t.schema_id
+            """)
+            current = {f"{s}.{t}": _stamp(md) for s, t, md in cur.fetchall()}
+            current = {t: md for t, md in current.items() if self.is_allowed(t)}
+
+            dropped = [t for t in self.tables if t not in current]
+            changed = [t for t, md in current.items()
+                       if t not in self.tables or self.tables[t]["modified"] != md]
+            for t in dropped:
+                del self.tables[t]
+                self.index.remove_table(t)
+            if changed:
+                cols = self._load_columns(conn, changed, full=not self.tables)
+                descs = self._load_descriptions(conn)
+                pks = self._load_primary_keys(conn)
+                for t in changed:
+                    tcols = cols.get(t, [])
+                    for c in tcols:
+                        d = descs.get((t, c["column"]))
+                        if d: c["description"] = d
+                    self.tables[t] = {"modified": current[t], "columns": tcols,
+                                      "description": descs.get((t, None)),
+                                      "primary_key": pks.get(t, [])}
+                    self.index.upsert_table(t, tcols, descs.get((t, None)))
+            self.loaded_at = time.time()
+            return {"loaded": len(changed), "dropped": len(dropped), "tables": len(self.tables)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serialisierbarer Zustand (für den persistenten Cache)."""
+        with self._lock:
+            return {"tables": self.tables}
+
+    def load_snapshot(self, snap: Dict[str, Any]):
+        """Übernimmt einen gespeicherten Katalog; der nächste refresh() gleicht nur Differenzen ab."""
+        with self._lock:
+            tables = snap.get("tables") or {}
+            if any("primary_key" not in e for e in tables.values()): return   # älteres Format -> neu laden
+            self.tables = {t: e for t, e in tables.items() if self.is_allowed(t)}
+            self.index = SchemaIndex()
+            for t, e in self.tables.items():
+                self.index.upsert_table(t, e["columns"], e.get("description"))
+
+    @staticmethod
+    def _load_columns(conn, tables: List[str], full: bool) -> Dict[str, List[Dict[str, Any]]]:
+        cur = conn.cursor(as_dict=True)
+        sql = """
+            SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE,
+                   CHARACTER_MAXIMUM_LENGTH, ORDINAL_POSITION
+            FROM INFORMATION_SCHEMA.COLUMNS
+        """
+        wanted = set(tables)
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        if full or len(wanted) > 50:
+            cur.execute(sql + " ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION")
+            rows = cur.fetchall()
+        else:
+            rows = []
+            for t in tables:
+                schema, _, name = t.partition(".")
+                cur.execute(sql + " WHERE TABLE_SCHEMA=%s AND TABLE_NAME=%s ORDER BY ORDINAL_POSITION",
+                            (schema, name))
+                rows.extend(cur.fetchall())
+        for r in rows:
+            t = f"{r['TABLE_SCHEMA']}.{r['TABLE_NAME']}"
+            if t not in wanted: continue
+            out.setdefault(t, []).append({
+                "column": r["COLUMN_NAME"],
+                "type": r["DATA_TYPE"],
+                "nullable": (r["IS_NULLABLE"] == "YES"),
+                "max_len": r["CHARACTER_MAXIMUM_LENGTH"],
+                "position": r["ORDINAL_POSITION"],
+            })
+        return out
+
+    @staticmethod
+    def _load_primary_keys(conn) -> Dict[str, List[str]]:
+        """Primärschlüssel-Spalten je Tabelle in Schlüsselreihenfolge (für fetch_blob)."""
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT s.name, t.name, c.name
+            FROM sys.indexes i
+            JOIN sys.tables t  ON t.object_id = i.object_id
+            JOIN sys.schemas s ON s.schema_id = t.schema_id
+            JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.is_primary_key = 1
+            ORDER BY s.name, t.name, ic.key_ordinal
+        """)
+        out: Dict[str, List[str]] = {}
+        for s, t, c in cur.fetchall(): out.setdefault(f"{s}.{t}", []).append(c)
+        return out
+
+    @staticmethod
+    def _load_descriptions(conn) -> Dict[Tuple[str, Optional[str]], str]:
+        """MS_Description-Extended-Properties (optional; fehlende Rechte -> keine Beschreibungen)."""
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT s.name, t.name, c.name, CAST(ep.value AS NVARCHAR(4000))
+                FROM sys.extended_properties ep
+                JOIN sys.tables t  ON t.object_id = ep.major_id
+                JOIN sys.schemas s ON s.schema_id = t.schema_id
+                LEFT JOIN sys.columns c ON c.object_id = ep.major_id AND c.column_id = ep.minor_id
+                WHERE ep.class = 1 AND ep.name = 'MS_Description'
+            """)
+            return {(f"{s}.{t}", c): d for s, t, c, d in cur.fetchall() if d}
+        except Exception:
+            return {}
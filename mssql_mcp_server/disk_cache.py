@@ -0,0 +1,128 @@
+# mssql_mcp_server/disk_cache.py
+"""
+Optionaler persistenter Cache (SQLite) – überlebt Neustarts des STDIO-Servers je Chat-Session.
+
+- Einträge sind nach scope (Server/Datenbank), Namensraum und Schlüssel abgelegt und tragen eine
+  Version (z. B. Schema-Version); ein Treffer erfordert identische Version und nicht abgelaufene TTL.
+- Werte werden als zlib-komprimiertes JSON gespeichert.
+- Größenbegrenzung über max_bytes, Verdrängung nach letztem Zugriff (LRU).
+- Mehrere Prozesse (HTTP-Worker) können dieselbe Datei nutzen (WAL). Schreibzugriffe sind
+  best effort: ist die Datei zu lange gesperrt, wird der Eintrag verworfen statt den Request zu blockieren.
+"""
+import json, sqlite3, threading, time, zlib
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    def __init__(self, path: str, scope: str, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.scope = scope
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.busy = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                scope TEXT NOT NULL, ns TEXT NOT NULL, key TEXT NOT NULL,
+                version TEXT, value BLOB NOT NULL, size INTEGER NOT NULL,
+                expires REAL, accessed REAL NOT NULL,
+                PRIMARY KEY (scope, ns, key))
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed)")
+        self._total = 0
+        self._written = 0   # seit dem letzten _sync() selbst geschriebene Bytes
+        self._sync()
+        self._db.execute("PRAGMA busy_timeout=2000")   # nach dem Anlegen: Requests nicht lange auf Sperren warten lassen
+
+    def get(self, ns: str, key: str, version: Optional[str] = None) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, value, expires, accessed FROM entries WHERE scope=? AND ns=? AND key=?",
+                (self.scope, ns, key)).fetchone()
+            if row is None or row[0] != version or (row[2] is not None and row[2] < now):
+                self.misses += 1
+                return None
+            self.hits += 1
+            if now - row[3] > 60:   # LRU-Zeitstempel grob halten: spart Schreibsperren bei jedem Treffer
+                self._write("UPDATE entries SET accessed=? WHERE scope=? AND ns=? AND key=?",
+                            (now, self.scope, ns, key))
+        return json.loads(zlib.decompress(row[1]))
+
+    def put(self, ns: str, key: str, value: Any, version: Optional[str] = None, ttl_s: Optional[float] = None):
+        blob = zlib.compress(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+        if len(blob) > self.max_bytes // 4: return   # einzelne Riesen-Einträge nicht cachen
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE scope=? AND ns=? AND key=?",
+                                   (self.scope, ns, key)).fetchone()
+            if not self._write(
+                    "INSERT OR REPLACE INTO entries (scope, ns, key, version, value, size, expires, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.scope, ns, key, version, blob, len(blob), now + ttl_s if ttl_s else None, now)):
+                return
+            self._total += len(blob) - (old[0] if old else 0)
+            self._written += len(blob)
+            # _total kennt nur die eigenen Schreibzugriffe; andere Worker füllen dieselbe Datei
+            if self._written >= self.max_bytes // 16 or self._total > self.max_bytes:
+                try:
+                    self._sync()
+                except sqlite3.OperationalError:
+                    self.busy += 1
+            if self._total > self.max_bytes:
+                try:
+                    self._evict()
+                except sqlite3.OperationalError:
+                    self.busy += 1   # ein anderer Worker räumt gerade auf
+
+    def _write(self, sql: str, params: tuple) -> bool:
+        try:
+            self._db.execute(sql, params)
+            return True
+        except sqlite3.OperationalError:   # "database is locked" nach timeout
+            self.busy += 1
+            return False
+
+    def _sync(self):
+        """Gesamtgröße aller Prozesse aus der Datei lesen."""
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._written = 0
+
+    def _evict(self):
+        """Älteste Zugriffe löschen, bis 90 % von max_bytes unterschritten sind (scope-übergreifend)."""
+        target = int(self.max_bytes * 0.9)
+        self._db.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+        self._sync()
+        while self._total > target:
+            rows = self._db.execute("SELECT rowid, size FROM entries ORDER BY accessed LIMIT 100").fetchall()
+            if not rows: break
+            self._db.execute(f"DELETE FROM entries WHERE rowid IN ({','.join(str(r[0]) for r in rows)})")
+            self._total -= sum(r[1] for r in rows)
+
+    def validate(self, version: str, namespaces: tuple) -> int:
+        """Entfernt Einträge dieses scopes, deren Version nicht mehr passt. Liefert Anzahl gelöschter."""
+        with self._lock:
+            marks = ",".join("?" * len(namespaces))
+            try:
+                cur = self._db.execute(
+                    f"DELETE FROM entries WHERE scope=? AND ns IN ({marks}) AND (version IS NULL OR version <> ?)",
+                    (self.scope, *namespaces, version))
+            except sqlite3.OperationalError:
+                self.busy += 1   # alte Einträge treffen ohnehin nicht mehr (Version passt nicht)
+                return 0
+            self._sync()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total, "max_bytes": self.max_bytes,
+                "busy": self.busy,
+                "hit_rate": round(self.hits / total, 4) if total else None}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,23 +1,28 @@
 # mssql_mcp_server/http.py
-from fastapi import FastAPI, Request
-from .server import _handle, _parse_server_and_port, DB_SERVER, DB_DB, ALLOW_TABLES, ALLOW_SCHEMAS, ROW_LIMIT, QUERY_TIMEOUT, _log
+import os
+from fastapi import FastAPI, Request, Response
+from starlette.concurrency import run_in_threadpool
+from .server import _handle, _t, _targets, IMPORT_MS, _log, start_warmup
 
 app = FastAPI(title="mssql-mcp HTTP")
 
 @app.on_event("startup")
 async def startup():
-    host, port = _parse_server_and_port(DB_SERVER)
-    _log("INFO", "mssql_mcp_server http starting",
-         server=f"{host}:{port}", database=DB_DB,
-         allow_tables=sorted(list(ALLOW_TABLES)) or None,
-         allow_schemas=sorted(list(ALLOW_SCHEMAS)) or None,
-         row_limit=ROW_LIMIT, timeout=QUERY_TIMEOUT)
+    _log("INFO", "mssql_mcp_server http starting", **_t().describe(),
+         targets={n: t.describe() for n, t in _targets.items()} if len(_targets) > 1 else None,
+         import_ms=IMPORT_MS, pid=os.getpid())
+    start_warmup()
 
 @app.post("/mcp")
-async def mcp(request: Request):
+async def mcp(request: Request, response: Response):
     try:
         data = await request.json()
     except Exception:
         return {"ok": False, "error": "invalid_json"}
-    resp = _handle(data)   # <- liefert dict
+    request_id = request.headers.get("x-request-id") or request.headers.get("x-correlation-id")
+    # _handle blockiert (DB, JSON) -> Threadpool, damit ein Worker parallel bedient (POOL_SIZE, DB-Budget)
+    resp = await run_in_threadpool(_handle, data, transport="http", traceparent=request.headers.get("traceparent"),
+                                   request_id=request_id)   # <- liefert dict
+    if "trace" in resp: response.headers["X-Trace-Id"] = resp["trace"]["trace_id"]
+    if request_id: response.headers["X-Request-Id"] = request_id
     return resp            # <- wichtig: dict zurück, NICHT JSONResponse
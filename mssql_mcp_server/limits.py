@@ -0,0 +1,92 @@
+# mssql_mcp_server/limits.py
+"""
+Prozessübergreifendes DB-Budget: höchstens n gleichzeitige DB-Zugriffe je Ziel, egal wie viele
+HTTP-Worker laufen.
+
+Jeder Slot ist eine Lock-Datei (<basis>.<i>), belegt per flock(LOCK_EX | LOCK_NB). Stirbt ein Worker,
+gibt das Betriebssystem seine Locks frei – kein Aufräumen nötig. flock gilt je Dateideskriptor,
+daher öffnet jeder Slot seinen eigenen; welche Slots der eigene Prozess hält, merkt sich _held.
+Ohne fcntl (Windows) begrenzt ein threading.BoundedSemaphore nur den eigenen Prozess.
+"""
+import os, random, threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+
+
+class SlotTimeoutError(RuntimeError):
+    def __init__(self, name: str, slots: int, waited: float):
+        super().__init__(f"DB-Budget für '{name}' ausgeschöpft ({slots} gleichzeitige Zugriffe) – "
+                         f"nach {waited:.1f} s kein freier Slot.")
+
+
+class DbSlots:
+    def __init__(self, name: str, base_path: str, slots: int, wait_s: float = 10.0):
+        self.name = name
+        self.slots = slots
+        self.wait_s = wait_s
+        self.shared = fcntl is not None
+        self.acquired = 0
+        self.waited = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._held: set = set()
+        if self.shared:
+            os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+            self._fds: List[int] = [os.open(f"{base_path}.{i}", os.O_RDWR | os.O_CREAT, 0o600) for i in range(slots)]
+        else:
+            self._sem = threading.BoundedSemaphore(slots)
+
+    def _try(self) -> int:
+        with self._lock:
+            free = [i for i in range(self.slots) if i not in self._held]
+            random.shuffle(free)   # nicht alle Worker auf Slot 0 stürzen
+            for i in free:
+                try:
+                    fcntl.flock(self._fds[i], fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+                self._held.add(i)
+                return i
+        return -1
+
+    def _release(self, i: int):
+        with self._lock:
+            fcntl.flock(self._fds[i], fcntl.LOCK_UN)
+            self._held.discard(i)
+
+    @contextmanager
+    def slot(self):
+        start = time.monotonic()
+        if not self.shared:
+            if not self._sem.acquire(timeout=self.wait_s):
+                self.timeouts += 1
+                raise SlotTimeoutError(self.name, self.slots, time.monotonic() - start)
+            self.acquired += 1
+            try:
+                yield
+            finally:
+                self._sem.release()
+            return
+        i, delay = self._try(), 0.002
+        if i < 0: self.waited += 1
+        while i < 0:
+            if time.monotonic() - start >= self.wait_s:
+                self.timeouts += 1
+                raise SlotTimeoutError(self.name, self.slots, time.monotonic() - start)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+            i = self._try()
+        self.acquired += 1
+        try:
+            yield
+        finally:
+            self._release(i)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"slots": self.slots, "shared": self.shared, "held": len(self._held),
+                "acquired": self.acquired, "waited": self.waited, "timeouts": self.timeouts}
@@ -0,0 +1,83 @@
+# mssql_mcp_server/recorder.py
+"""
+Opt-in-Mitschnitt des Request-Verkehrs (für Tuning/Replay, siehe benchmarks/replay.py).
+
+Aktiv, wenn RECORD_PATH gesetzt ist. Je Request eine kompakte JSON-Zeile (append-only):
+  {"t": <epoch>, "tr": "stdio"|"http"|"mcp", "req": {...}, "ms": <Dauer>, "bytes": <Antwortgröße>, "ok": true}
+
+RECORD_REDACT steuert das Schwärzen von SQL-Literalen in `sql`/`where`:
+  none     – unverändert
+  strings  – '...' / N'...' -> '?'          (Standard)
+  all      – zusätzlich Zahlen -> 0
+Bewusst ohne Abhängigkeiten, damit mcp_server.py den Recorder vor dem Tool-Import nutzen kann.
+"""
+import json, os, threading
+from typing import Any, Dict, Optional
+
+_REDACT_KEYS = ("sql", "where")
+_KEEP_AFTER = ("top", "offset", "next", "by")
+
+
+def redact_sql(sql: str, mode: str = "strings") -> str:
+    """Ersetzt Literale außerhalb von [Bezeichnern] und "Bezeichnern"."""
+    if mode == "none" or not sql: return sql
+    out = []
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch in "[\"":                                   # Bezeichner unverändert übernehmen
+            close = "]" if ch == "[" else '"'
+            j = sql.find(close, i + 1)
+            j = n - 1 if j < 0 else j
+            out.append(sql[i:j + 1]); i = j + 1
+        elif ch == "'":                                   # String-Literal inkl. '' -Escapes
+            j = i + 1
+            while j < n:
+                if sql[j] == "'" and (j + 1 >= n or sql[j + 1] != "'"): break
+                j += 2 if sql[j] == "'" else 1
+            out.append("'?'"); i = j + 1
+        elif mode == "all" and ch.isdigit() and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] in "_$@#")):
+            j = i
+            while j < n and (sql[j].isdigit() or sql[j] == "."): j += 1
+            prev = "".join(out).rstrip("( \t\r\n").rsplit(None, 1)[-1:] or [""]
+            # TOP/OFFSET/FETCH/ORDER BY-Zahlen sind Struktur, keine Daten -> behalten
+            out.append(sql[i:j] if prev[0].lower() in _KEEP_AFTER else "0"); i = j
+        else:
+            out.append(ch); i += 1
+    return "".join(out)
+
+
+class Recorder:
+    def __init__(self, path: Optional[str] = None, redact: Optional[str] = None):
+        self.path = path if path is not None else os.getenv("RECORD_PATH", "")
+        self.redact = (redact or os.getenv("RECORD_REDACT", "strings")).lower()
+        self._fh = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _scrub(self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            return {k: (redact_sql(v, self.redact) if k in _REDACT_KEYS and isinstance(v, str) else self._scrub(v))
+                    for k, v in obj.items()}
+        if isinstance(obj, list): return [self._scrub(v) for v in obj]
+        return obj
+
+    def record(self, transport: str, req: Dict[str, Any], started: float, ms: float, resp: Any, ok: bool):
+        if not self.enabled: return
+        try:
+            size = len(json.dumps(resp, default=str, ensure_ascii=False).encode("utf-8"))
+            line = json.dumps({"t": round(started, 4), "tr": transport, "req": self._scrub(req),
+                               "ms": round(ms, 3), "bytes": size, "ok": ok},
+                              separators=(",", ":"), ensure_ascii=False, default=str)
+            with self._lock:
+                if self._fh is None: self._fh = open(self.path, "a", encoding="utf-8")
+                self._fh.write(line + "\n"); self._fh.flush()
+        except Exception:
+            pass   # Mitschnitt darf den Request nie scheitern lassen
+
+    def close(self):
+        with self._lock:
+            if self._fh: self._fh.close(); self._fh = None
@@ -0,0 +1,127 @@
+# mssql_mcp_server/render.py
+"""
+Kompakte Textdarstellung von Ergebnistabellen für MCP-Antworten (Kontext-Tokens sparen).
+
+render_rows() gibt alle Spalten aus, als ausgerichtete Tabelle oder CSV, innerhalb eines Byte-Budgets:
+  - Spalten, die in allen Zeilen leer bzw. gleich sind, entfallen und stehen einmal in der Fußzeile
+    (verlustfrei, ab 2 Zeilen). Sind alle Zeilen gleich, erscheint nur die erste.
+  - Zellen über max_cell Zeichen werden mit "…" gekürzt, Zeilenumbrüche als "\\n" dargestellt.
+  - Passt die Kopfzeile nicht ins Budget, entfallen hintere Spalten (Namen in der Fußzeile);
+    Kopf- und Fußzeile belegen je höchstens etwa ein Viertel des Budgets ("… and n more");
+    danach werden Zeilen ausgegeben, solange das Budget reicht ("… n more rows").
+Bewusst ohne Abhängigkeiten, damit mcp_server.py den Renderer vor dem Tool-Import nutzen kann.
+"""
+import csv, io
+from typing import Any, Dict, List, Optional, Tuple
+
+BYTES_PER_TOKEN = 4   # grobe Schätzung für gemischten Text/Zahlen
+
+
+def _cell(v: Any, fmt: str) -> str:
+    if v is None: return "" if fmt == "csv" else "NULL"
+    if isinstance(v, bool): return "1" if v else "0"
+    if isinstance(v, float) and v.is_integer(): return str(int(v))
+    return str(v).replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n").replace("\t", " ")
+
+
+def _elide(s: str, max_cell: int) -> Tuple[str, bool]:
+    if max_cell > 0 and len(s) > max_cell: return s[:max_cell - 1] + "…", True
+    return s, False
+
+
+def _size(s: str) -> int:
+    return len(s.encode("utf-8"))
+
+
+def render_rows(rows: List[Dict[str, Any]], columns: Optional[List[str]] = None, fmt: str = "table",
+                budget: int = 8000, max_cell: int = 60) -> Tuple[str, Dict[str, Any]]:
+    """Liefert (Text, Info); Info beschreibt, was gekürzt oder weggelassen wurde."""
+    columns = list(columns or (rows[0].keys() if rows else []))
+    info: Dict[str, Any] = {"rows": len(rows), "rows_shown": 0, "columns": len(columns)}
+    if not rows or not columns: return "", info
+
+    # verlustfreie Spaltenreduktion: leer bzw. konstant über alle Zeilen
+    empty, constant, keep = [], {}, []
+    for c in columns:
+        vals = [r.get(c) for r in rows]
+        if all(v is None or v == "" for v in vals): empty.append(c)
+        elif len(rows) > 1 and all(v == vals[0] for v in vals): constant[c] = vals[0]
+        else: keep.append(c)
+    identical = not keep   # alle Zeilen gleich: eine Zeile zeigen statt nur Fußzeile bzw. Leerzeilen
+    if identical:
+        keep = [c for c in columns if c in constant] or empty
+        if keep is empty: empty = []   # nur leere Spalten: als NULL zeigen
+        constant = {}
+    shown_rows = rows[:1] if identical else rows
+
+    elided = 0
+    cells: List[List[str]] = []
+    for r in shown_rows:
+        line = []
+        for c in keep:
+            s, cut = _elide(_cell(r.get(c), fmt), max_cell)
+            elided += cut
+            line.append(s)
+        cells.append(line)
+    numeric = [all(isinstance(r.get(c), (int, float)) and not isinstance(r.get(c), bool)
+                   for r in shown_rows if r.get(c) is not None) for c in keep]
+
+    if fmt == "csv":
+        def fmt_line(values: List[str]) -> str:
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator="").writerow(values)
+            return buf.getvalue()
+    else:
+        widths = [max(len(c), *(len(line[i]) for line in cells)) for i, c in enumerate(keep)]
+
+        def fmt_line(values: List[str], header: bool = False) -> str:
+            return " | ".join(v.rjust(widths[i]) if numeric[i] and not header else v.ljust(widths[i])
+                              for i, v in enumerate(values)).rstrip()
+
+    # zu breit: hintere Spalten weglassen, bis die Kopfzeile höchstens ein Viertel des Budgets braucht
+    shown = len(keep)
+    header = fmt_line(keep) if fmt == "csv" else fmt_line(keep, True)
+    while shown > 1 and _size(header) > budget // 4:
+        shown -= 1
+        if fmt != "csv": widths = widths[:shown]
+        header = fmt_line(keep[:shown]) if fmt == "csv" else fmt_line(keep[:shown], True)
+    out = [header]
+    if fmt != "csv": out.append("-+-".join("-" * w for w in widths[:shown]))
+
+    used = sum(_size(l) + 1 for l in out)
+    footer = _footer(empty, constant, keep[shown:], fmt, max_cell, budget // 4)
+    reserve = _size(footer) + 40
+    for line in cells:
+        text = fmt_line(line[:shown])
+        if used + _size(text) + 1 + reserve > budget and info["rows_shown"] > 0: break
+        out.append(text); used += _size(text) + 1
+        info["rows_shown"] += 1
+
+    if identical and len(rows) > 1: out.append(f"… {len(rows) - 1} more identical rows")
+    elif info["rows_shown"] < len(rows): out.append(f"… {len(rows) - info['rows_shown']} more rows")
+    if footer: out.append(footer)
+    info.update({"columns_shown": shown, "empty": empty or None, "constant": list(constant) or None,
+                 "omitted": keep[shown:] or None, "cells_elided": elided})
+    return "\n".join(out), info
+
+
+def _join(items: List[str], limit: int) -> str:
+    """Kommagetrennt, höchstens etwa limit Bytes; der Rest als "… and n more"."""
+    out, used = [], 0
+    for i, s in enumerate(items):
+        if out and used + _size(s) + 2 > limit: return ", ".join(out) + f", … and {len(items) - i} more"
+        out.append(s); used += _size(s) + 2
+    return ", ".join(out)
+
+
+def _footer(empty: List[str], constant: Dict[str, Any], omitted: List[str], fmt: str, max_cell: int,
+            limit: int) -> str:
+    """Fußzeile mit höchstens etwa limit Bytes, gleichmäßig auf die Listen verteilt."""
+    each = max(limit // max(bool(constant) + bool(empty) + bool(omitted), 1) - 30, 40)
+    parts = []
+    if constant:
+        parts.append("same in all rows: " + _join([f"{c}={_elide(_cell(v, fmt), max_cell)[0]}"
+                                                   for c, v in constant.items()], each))
+    if empty: parts.append("empty: " + _join(empty, each))
+    if omitted: parts.append(f"{len(omitted)} columns omitted: " + _join(omitted, each))
+    return "\n".join(parts)
@@ -0,0 +1,115 @@
+# mssql_mcp_server/resilience.py
+"""
+Fehlerklassifikation, Backoff mit Jitter und Circuit Breaker für DB-Zugriffe.
+
+classify() ordnet pymssql-Fehler ein:
+  deadlock      1205              Deadlock-Opfer – Wiederholung sinnvoll
+  lock_timeout  1222              SET LOCK_TIMEOUT überschritten – Wiederholung sinnvoll
+  connection    20003/20004/20006/20009/20017/20047, 233/10053/10054, geschlossene Verbindung
+                                  TDS-Verbindung weg – Pool leeren, neu verbinden, zählt für den Breaker
+  alles andere  None              nicht wiederholbar (Syntax, Rechte, Guards)
+
+CircuitBreaker: nach `threshold` Verbindungsfehlern in Folge für `reset_s` Sekunden offen (sofortiger Fehler
+statt weiterer Last), danach genau ein Probeaufruf (half-open). Meldet die Probe nach weiteren `reset_s`
+Sekunden weder Erfolg noch Fehler, darf der nächste Aufruf proben. Bewusst ohne Abhängigkeiten.
+"""
+import random, re, threading, time
+from typing import Any, Callable, Dict, Optional
+
+DEADLOCK = "deadlock"
+LOCK_TIMEOUT = "lock_timeout"
+CONNECTION = "connection"
+
+_CODES = {
+    1205: DEADLOCK, 1222: LOCK_TIMEOUT,
+    # DB-Lib/FreeTDS: Timeout, Lesen/Schreiben fehlgeschlagen, kein Connect, EOF, DBPROCESS tot
+    20002: CONNECTION, 20003: CONNECTION, 20004: CONNECTION, 20006: CONNECTION,
+    20009: CONNECTION, 20017: CONNECTION, 20047: CONNECTION,
+    # Server-/Transportfehler (Sitzung beendet, TCP-Reset) und Azure-"vorübergehend nicht verfügbar"
+    233: CONNECTION, 10053: CONNECTION, 10054: CONNECTION,
+    40197: CONNECTION, 40501: CONNECTION, 40613: CONNECTION,
+}
+# Nur den Anfang der Meldung prüfen – der Rest enthält oft Nutzdaten ("… value '10054' …")
+_dblib_rx = re.compile(r"^\W*(?:b['\"])?DB-Lib error message (\d+)\b")
+_closed_rx = re.compile(r"^\W*(?:b['\"])?(?:connection is closed|not connected|dbprocess is dead)", re.IGNORECASE)
+
+
+def error_code(exc: BaseException) -> Optional[int]:
+    """Fehlernummer aus args[0] (pymssql: (nummer, meldung)), sonst aus dem DB-Lib-Präfix der Meldung."""
+    args = getattr(exc, "args", ())
+    if args and isinstance(args[0], int) and not isinstance(args[0], bool): return args[0]
+    m = _dblib_rx.match(str(args[0]) if args else str(exc))
+    return int(m.group(1)) if m else None
+
+
+def classify(exc: BaseException) -> Optional[str]:
+    if isinstance(exc, (ValueError, AssertionError, KeyError, TypeError, CircuitOpenError)):
+        return None   # eigene Guards/Parameterfehler – nie wiederholen
+    if type(exc).__name__ == "InterfaceError": return CONNECTION
+    code = error_code(exc)
+    if code is not None: return _CODES.get(code)   # bekannte Nummer ist maßgeblich, auch wenn nicht wiederholbar
+    args = getattr(exc, "args", ())
+    return CONNECTION if _closed_rx.match(str(args[0]) if args else str(exc)) else None
+
+
+def backoff(attempt: int, base_s: float, cap_s: float = 2.0) -> float:
+    """Full Jitter: zufällig in [0, min(cap, base * 2^attempt)] – verhindert synchrone Wiederholungswellen."""
+    return random.uniform(0, min(cap_s, base_s * (2 ** attempt)))
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Datenbank '{name}' derzeit nicht erreichbar (Circuit Breaker offen) – "
+                         f"erneut versuchen in {max(retry_after, 0.1):.1f} s.")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int = 5, reset_s: float = 30.0,
+                 on_change: Optional[Callable[[str, str, str], None]] = None):
+        self.name = name
+        self.threshold = threshold
+        self.reset_s = reset_s
+        self.on_change = on_change
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_at = 0.0   # Start des laufenden Probeaufrufs (half_open)
+        self._lock = threading.Lock()
+
+    def _set(self, state: str):
+        old, self.state = self.state, state
+        if old != state and self.on_change: self.on_change(self.name, old, state)
+
+    def before(self):
+        """Vor jedem DB-Zugriff: wirft CircuitOpenError, solange der Breaker offen ist."""
+        if self.threshold <= 0: return
+        with self._lock:
+            if self.state == "closed": return
+            now = time.time()
+            if self.state == "open":
+                wait = self.opened_at + self.reset_s - now
+                if wait <= 0:
+                    self._set("half_open"); self._probe_at = now; return   # dieser Aufruf ist die Probe
+            else:
+                wait = self._probe_at + self.reset_s - now
+                if wait <= 0:   # Probe hat sich nie zurückgemeldet -> neue Probe statt dauerhaft half_open
+                    self._probe_at = now; return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, wait)
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            if self.state != "closed": self._set("closed")
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.threshold > 0 and self.failures >= self.threshold):
+                self.opened_at = time.time()
+                self._set("open")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
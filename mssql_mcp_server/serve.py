@@ -0,0 +1,58 @@
+# mssql_mcp_server/serve.py
+"""
+HTTP-Betrieb mit mehreren Worker-Prozessen (uvicorn --workers).
+
+  mssql-mcp-http --workers 4 --port 8000
+
+Mit mehr als einem Worker setzt der Start vor dem Forken gemeinsame Vorgaben, sofern nicht selbst gesetzt:
+  DISK_CACHE_PATH     SHARED_DIR/cache.sqlite3 – Schema-Katalog, Beispiele und heiße Ergebnisse für alle Worker
+  DB_MAX_CONCURRENCY  8 – gleichzeitige DB-Zugriffe aller Worker zusammen (Lock-Dateien in SHARED_DIR)
+  POOL_SIZE           Budget / Worker (aufgerundet) – Leerlauf-Verbindungen je Worker
+DISK_CACHE_RESULT_TTL bleibt bewusst 0: geteilte Query-Ergebnisse sehen Datenänderungen erst nach der TTL,
+das muss man selbst einschalten.
+Die Worker importieren den Server selbst; dieser Prozess lädt weder pymssql noch Verbindungen.
+"""
+import argparse, json, math, os, sys, tempfile, time
+
+
+def _log(level: str, msg: str, **kw):
+    print(json.dumps({"log": {"ts": time.time(), "level": level, "msg": msg, **kw}}), flush=True, file=sys.stderr)
+
+
+def shared_defaults(workers: int) -> dict:
+    """ENV-Vorgaben für den Multi-Worker-Betrieb; bereits gesetzte Variablen bleiben unverändert."""
+    if workers <= 1: return {}
+    shared = os.getenv("SHARED_DIR", os.path.join(tempfile.gettempdir(), "mssql-mcp"))
+    os.makedirs(shared, exist_ok=True)
+    budget = int(os.getenv("DB_MAX_CONCURRENCY", "8"))
+    env = {"DISK_CACHE_PATH": os.path.join(shared, "cache.sqlite3"), "DB_MAX_CONCURRENCY": str(budget),
+           "POOL_SIZE": str(max(1, math.ceil(budget / workers))) if budget > 0 else "4"}
+    return {k: v for k, v in env.items() if not os.getenv(k)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="mssql-mcp HTTP-Server (mehrere Worker)")
+    ap.add_argument("--host", default=os.getenv("HTTP_HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("HTTP_PORT", "8000")))
+    ap.add_argument("--workers", type=int, default=int(os.getenv("HTTP_WORKERS", "1")))
+    ap.add_argument("--app", default="mssql_mcp_server.http:app", help=argparse.SUPPRESS)   # Benchmarks: Fake-App
+    ap.add_argument("--factory", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    defaults = shared_defaults(args.workers)
+    os.environ.update(defaults)   # wird an die Worker vererbt
+    if args.workers > 1:
+        try:
+            import fcntl  # noqa: F401
+        except ImportError:
+            _log("WARNING", "db_budget_per_worker", reason="fcntl nicht verfügbar – Budget gilt je Worker")
+    _log("INFO", "mssql_mcp_server http workers", workers=args.workers, host=args.host, port=args.port,
+         defaults=defaults or None)
+
+    import uvicorn
+    uvicorn.run(args.app, host=args.host, port=args.port, workers=args.workers, factory=args.factory,
+                log_level="debug" if os.getenv("LOG_LEVEL", "INFO").upper() == "DEBUG" else "info")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
-import os, sys, json, re, time, uuid, traceback, base64, decimal, datetime
-from typing import Any, Dict, List, Tuple
+import time
+_T_IMPORT = time.perf_counter()
+import os, sys, json, re, uuid, traceback, base64, decimal, datetime, threading, functools, hashlib, tempfile
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -21,12 +25,52 @@ DENY_PATTERNS  = [p for p in os.getenv("DENY_PATTERNS", "").split("|") if p]
 ROW_LIMIT     = int(os.getenv("ROW_LIMIT", "500"))
 QUERY_TIMEOUT = int(os.getenv("QUERY_TIMEOUT", "10"))  # Sekunden
 BINARY_MODE   = os.getenv("BINARY_MODE", "placeholder")  # "placeholder" | "base64" | "hex"
-BINARY_MAX    = int(os.getenv("BINARY_MAX", "65536"))    # max Bytes encodieren
+BINARY_MAX    = int(os.getenv("BINARY_MAX", "65536"))    # max Bytes encodieren (auch max. Chunk bei fetch_blob)
+LOB_PREVIEW_CHARS = int(os.getenv("LOB_PREVIEW_CHARS", "256"))  # placeholder: Text-LOBs auf n Zeichen kürzen (0 = vollständig)
+SCHEMA_REFRESH_S = int(os.getenv("SCHEMA_REFRESH_S", "60"))  # Katalog-Abgleich höchstens alle n Sekunden
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "300"))  # Fallback-TTL, wenn keine Änderungszähler lesbar
+SAMPLE_MAX_PAGES = int(os.getenv("SAMPLE_MAX_PAGES", "1000"))    # max. gelesene Datenseiten bei Zufalls-Samples
+POOL_SIZE     = int(os.getenv("POOL_SIZE", "4"))        # max. gehaltene Leerlauf-Verbindungen
+POOL_IDLE_S   = int(os.getenv("POOL_IDLE_S", "300"))    # Leerlauf-Verbindungen danach schließen
+WARMUP        = os.getenv("WARMUP", "true").lower() == "true"  # Pool + Katalog im Hintergrund vorladen
+
+# Resilienz: Wiederholung bei Deadlock/Lock-Timeout/Verbindungsabbruch, Circuit Breaker je Ziel
+RETRY_MAX          = int(os.getenv("RETRY_MAX", "3"))            # Versuche je Tool-Aufruf (1 = keine Wiederholung)
+RETRY_BASE_MS      = int(os.getenv("RETRY_BASE_MS", "100"))      # Backoff-Basis (Full Jitter, verdoppelt je Versuch)
+REQUEST_DEADLINE_S = float(os.getenv("REQUEST_DEADLINE_S", "30"))  # keine Wiederholung über diese Gesamtdauer hinaus
+BREAKER_FAILURES   = int(os.getenv("BREAKER_FAILURES", "5"))     # Verbindungsfehler in Folge bis "offen" (0 = aus)
+BREAKER_RESET_S    = float(os.getenv("BREAKER_RESET_S", "30"))   # danach ein Probeaufruf
+
+# Mehrere HTTP-Worker: gemeinsames DB-Budget je Server über Lock-Dateien in SHARED_DIR
+DB_MAX_CONCURRENCY = int(os.getenv("DB_MAX_CONCURRENCY", "0"))  # gleichzeitige DB-Zugriffe aller Prozesse (0 = unbegrenzt)
+DB_SLOT_WAIT_S     = float(os.getenv("DB_SLOT_WAIT_S", "10"))   # max. Wartezeit auf einen freien Slot
+SHARED_DIR         = os.getenv("SHARED_DIR", os.path.join(tempfile.gettempdir(), "mssql-mcp"))
+
+# Zeitaufschlüsselung je Request (guard/connect/execute/fetch/…) in jeder Antwort; sonst nur mit "timing": true.
+# Span-Export über TRACE_EXPORT (Datei oder OTLP/HTTP-URL), siehe tracing.py.
+TRACE_TIMING = os.getenv("TRACE_TIMING", "false").lower() == "true"
+
+# Persistenter Cache (SQLite) – leer = aus
+DISK_CACHE_PATH       = os.getenv("DISK_CACHE_PATH", "")
+DISK_CACHE_MAX_MB     = int(os.getenv("DISK_CACHE_MAX_MB", "64"))
+DISK_CACHE_TTL        = int(os.getenv("DISK_CACHE_TTL", "86400"))    # columns_with_examples
+DISK_CACHE_RESULT_TTL = int(os.getenv("DISK_CACHE_RESULT_TTL", "0")) # Query-Ergebnisse; 0 = nicht cachen
+DISK_CACHE_RESULT_KB  = int(os.getenv("DISK_CACHE_RESULT_KB", "64")) # nur kleine Ergebnisse
+
+# Mehrere Ziele (Server/Datenbank) in einer Instanz, z. B. "de,at"; leer = ein Ziel "default".
+# Je Ziel überschreibt TARGET_<NAME>_<VAR> die globale Variable (z. B. TARGET_AT_MSSQL_DATABASE).
+TARGETS = [t.strip() for t in os.getenv("MSSQL_TARGETS", "").split(",") if t.strip()] or ["default"]
 
 LOG = os.getenv("LOG_LEVEL", "INFO").upper()
 
 # ---- DB (pymssql) ----
-import pymssql
+from .catalog import SchemaCatalog
+from .cache import VersionedCache
+from .recorder import Recorder
+from .disk_cache import DiskCache
+from .resilience import CONNECTION, CircuitBreaker, CircuitOpenError, backoff, classify, error_code
+from .limits import DbSlots
+from . import tracing
 
 
 def _parse_server_and_port(server_str: str) -> Tuple[str, int]:
@@ -41,14 +85,263 @@ def _parse_server_and_port(server_str: str) -> Tuple[str, int]:
 
 
 def _connect():
-    host, port = _parse_server_and_port(DB_SERVER)
+    import pymssql   # lazy: Handshake (ping/tools) braucht den Treiber nicht
+    tg = _t()
+    host, port = _parse_server_and_port(tg.server)
     return pymssql.connect(
         server=host, port=port,
-        user=DB_USER, password=DB_PASS, database=DB_DB,
-        login_timeout=QUERY_TIMEOUT, timeout=QUERY_TIMEOUT,
+        user=tg.user, password=tg.password, database=tg.database,
+        login_timeout=tg.query_timeout, timeout=tg.query_timeout,
         as_dict=False, tds_version='7.4', appname='mssql_mcp'
     )
 
+class _ConnectionPool:
+    """
+    Einfacher Pool wiederverwendbarer Verbindungen (spart Login + TLS je Tool-Call).
+    Nach einem Verbindungsfehler wird die Verbindung verworfen statt zurückgelegt (siehe _connection).
+    """
+
+    def __init__(self, size: int, idle_s: int):
+        self.size = size
+        self.idle_s = idle_s
+        self._idle: List[Tuple[Any, float]] = []
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def acquire(self):
+        with self._lock:
+            while self._idle:
+                conn, ts = self._idle.pop()
+                if time.time() - ts <= self.idle_s: return conn
+                _close_quietly(conn)
+        conn = _connect()   # Lookup zur Laufzeit: _connect lässt sich (z. B. für Benchmarks) ersetzen
+        self.created += 1
+        return conn
+
+    def release(self, conn, broken: bool = False):
+        if not broken:
+            try:
+                conn.rollback()   # offene implizite Transaktion beenden, Sperren freigeben
+            except Exception:
+                broken = True
+        with self._lock:
+            if not broken and len(self._idle) < self.size:
+                self._idle.append((conn, time.time())); return
+        _close_quietly(conn)
+
+    def fill(self, n: int):
+        conns = [self.acquire() for _ in range(max(0, min(n, self.size) - len(self._idle)))]
+        for c in conns: self.release(c)
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle: _close_quietly(conn)
+
+    def stats(self) -> Dict[str, int]:
+        return {"idle": len(self._idle), "size": self.size, "created": self.created}
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+# ---- Ziele (Multi-Datenbank / Multi-Server) ----
+def _csv_set(value: str) -> set:
+    return set(filter(None, [v.strip() for v in value.split(",")]))
+
+class Target:
+    """
+    Benanntes Ziel (Server + Datenbank) mit eigenem Pool, eigenen Freigaben/Limits und Caches.
+    Jede Einstellung: TARGET_<NAME>_<VAR>, sonst die globale Variable.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.prefix = "TARGET_" + re.sub(r"\W", "_", name).upper() + "_"
+        self.server   = self._env("MSSQL_SERVER", DB_SERVER)
+        self.database = self._env("MSSQL_DATABASE", DB_DB)
+        self.user     = self._env("MSSQL_USER", DB_USER)
+        self.password = self._env("MSSQL_PASSWORD", DB_PASS)
+
+        v = self._env("ALLOW_TABLES", None)
+        self.allow_tables = _csv_set(v) if v is not None else set(ALLOW_TABLES)
+        v = self._env("ALLOW_SCHEMAS", None)
+        self.allow_schemas = _csv_set(v) if v is not None else set(ALLOW_SCHEMAS)
+        v = self._env("DENY_COLUMNS", None)
+        self.deny_columns = [c.strip() for c in v.split(",") if c.strip()] if v is not None else list(DENY_COLUMNS)
+        v = self._env("DENY_PATTERNS", None)
+        self.deny_patterns = [p for p in v.split("|") if p] if v is not None else list(DENY_PATTERNS)
+        self.deny_patterns_re = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in self.deny_patterns]
+
+        self.row_limit     = int(self._env("ROW_LIMIT", ROW_LIMIT))
+        self.query_timeout = int(self._env("QUERY_TIMEOUT", QUERY_TIMEOUT))
+
+        self.pool = _ConnectionPool(int(self._env("POOL_SIZE", POOL_SIZE)), int(self._env("POOL_IDLE_S", POOL_IDLE_S)))
+        self.catalog = SchemaCatalog(is_allowed=lambda table: _table_allowed(table))
+        self.profile_cache = VersionedCache(max_entries=512,
+                                            ttl_s=int(self._env("PROFILE_CACHE_TTL", PROFILE_CACHE_TTL)))
+        self.watch_cache = VersionedCache(max_entries=128)   # Zustände von watch (Version -> Zeilen je Schlüssel)
+        self.breaker = CircuitBreaker(name, int(self._env("BREAKER_FAILURES", BREAKER_FAILURES)),
+                                      float(self._env("BREAKER_RESET_S", BREAKER_RESET_S)),
+                                      on_change=lambda n, old, new: _log("WARNING", "circuit_breaker", target=n,
+                                                                         previous=old, state=new))
+        self.retries = 0
+        self.gave_up = 0
+        n = int(self._env("DB_MAX_CONCURRENCY", DB_MAX_CONCURRENCY))
+        key = hashlib.sha1(self.server.lower().encode("utf-8")).hexdigest()[:12]   # Budget gilt je SQL Server
+        self.slots = DbSlots(name, os.path.join(SHARED_DIR, f"db-slots-{key}"), n,
+                             float(self._env("DB_SLOT_WAIT_S", DB_SLOT_WAIT_S))) if n > 0 else None
+        self.disk: Optional[DiskCache] = None      # wird am Modulende geöffnet (braucht _log)
+        self.schema_ver: Optional[str] = None
+        self.hot_seen: Dict[str, int] = {}
+        self.approx_distinct = True   # APPROX_COUNT_DISTINCT erst ab SQL Server 2019 -> bei Fehler COUNT(DISTINCT)
+
+    def _env(self, var: str, default: Any) -> Any:
+        return os.getenv(self.prefix + var, default)
+
+    def describe(self) -> Dict[str, Any]:
+        host, port = _parse_server_and_port(self.server)
+        return {"server": f"{host}:{port}", "database": self.database,
+                "allow_tables": sorted(self.allow_tables) or None,
+                "allow_schemas": sorted(self.allow_schemas) or None,
+                "row_limit": self.row_limit, "timeout": self.query_timeout}
+
+_targets: Dict[str, Target] = {}     # gefüllt im Katalog-Abschnitt (braucht _table_allowed)
+_current: ContextVar[Optional[Target]] = ContextVar("mssql_target", default=None)
+
+def _t() -> Target:
+    """Ziel des laufenden Requests; ohne Angabe das erste aus MSSQL_TARGETS."""
+    return _current.get() or _targets[TARGETS[0]]
+
+def _all_targets() -> bool:
+    """True, wenn kein Ziel gewählt ist und mehrere konfiguriert sind (tables/search_schema über alle)."""
+    return _current.get() is None and len(_targets) > 1
+
+@contextmanager
+def use_target(name: Optional[str]):
+    """Setzt das Ziel für den Block; None = keine Auswahl (Standardziel bzw. alle Ziele)."""
+    if name is None:
+        yield None; return
+    tg = _targets.get(name)
+    if tg is None:
+        raise ValueError(f"Unbekanntes Ziel '{name}'. Verfügbar: {', '.join(_targets)}")
+    token = _current.set(tg)
+    try:
+        yield tg
+    finally:
+        _current.reset(token)
+
+def _route(args: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Ziel aus 'target' oder aus einem Tabellenpräfix 'ziel:schema.tabelle' (wie von tables geliefert)."""
+    target = args.get("target") or None
+    table = args.get("table")
+    if isinstance(table, str) and ":" in table:
+        prefix, _, rest = table.partition(":")
+        if prefix in _targets:
+            if target and target != prefix:
+                raise ValueError(f"Tabelle '{table}' gehört nicht zu Ziel '{target}'.")
+            target, args = prefix, {**args, "table": rest}
+    return target, args
+
+@contextmanager
+def _connection():
+    """
+    Verbindung aus dem Pool des aktuellen Ziels; bei POOL_SIZE=0 wie bisher je Aufruf neu.
+    Verbindungsabbrüche verwerfen die Verbindung samt Leerlauf-Pool und zählen für den Circuit Breaker;
+    andere Fehler (Deadlock, Lock-Timeout, SQL-Fehler) geben die Verbindung nach Rollback zurück.
+    Mit DB_MAX_CONCURRENCY belegt jeder Zugriff vorher einen Slot des prozessübergreifenden DB-Budgets.
+    """
+    tg = _t()
+    with ExitStack() as held:
+        if tg.slots:
+            with tracing.phase("queue"):
+                held.enter_context(tg.slots.slot())
+        tg.breaker.before()   # erst nach dem Slot: ein Slot-Timeout darf keinen Probeaufruf verbrauchen
+        try:
+            with tracing.phase("connect", target=tg.name):
+                conn = tg.pool.acquire()
+        except Exception:
+            tg.breaker.failure()
+            raise
+        try:
+            yield _TracedConnection(conn) if tracing.current() is not None else conn
+        except Exception as e:
+            if classify(e) == CONNECTION:
+                tg.pool.release(conn, broken=True)
+                tg.pool.clear()          # Server/Netz weg -> die übrigen Leerlauf-Verbindungen sind es meist auch
+                tg.breaker.failure()
+            else:
+                tg.pool.release(conn)    # rollback() prüft die Verbindung; scheitert er, wird sie verworfen
+                tg.breaker.success()
+            raise
+        else:
+            tg.pool.release(conn)
+            tg.breaker.success()
+
+class _TracedCursor:
+    """Cursor-Hülle, solange ein Trace aktiv ist: ordnet execute/fetch den Phasen zu."""
+    __slots__ = ("_cur",)
+
+    def __init__(self, cur): self._cur = cur
+    def __getattr__(self, name): return getattr(self._cur, name)
+    def __iter__(self): return iter(self.fetchall())
+
+    def execute(self, sql, *args):
+        name = "lock_timeout" if sql.startswith("SET LOCK_TIMEOUT") else "execute"
+        with tracing.phase(name):
+            return self._cur.execute(sql, *args)
+
+    def fetchone(self):
+        with tracing.phase("fetch"): return self._cur.fetchone()
+    def fetchmany(self, *args):
+        with tracing.phase("fetch"): return self._cur.fetchmany(*args)
+    def fetchall(self):
+        with tracing.phase("fetch"): return self._cur.fetchall()
+
+class _TracedConnection:
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn): self._conn = conn
+    def __getattr__(self, name): return getattr(self._conn, name)
+    def cursor(self, *args, **kwargs): return _TracedCursor(self._conn.cursor(*args, **kwargs))
+
+_in_retry: ContextVar[bool] = ContextVar("mssql_in_retry", default=False)
+
+def _resilient(fn):
+    """
+    Wiederholt ein lesendes Tool bei Deadlock, Lock-Timeout oder Verbindungsabbruch mit Jitter-Backoff,
+    höchstens RETRY_MAX Versuche und nur, solange REQUEST_DEADLINE_S nicht überschritten wird.
+    Verschachtelte Tools (sample -> query) wiederholen nicht zusätzlich.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _in_retry.get(): return fn(*args, **kwargs)
+        token = _in_retry.set(True)
+        try:
+            deadline = time.monotonic() + REQUEST_DEADLINE_S
+            attempt = 0
+            while True:
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as e:
+                    kind = classify(e)
+                    if kind is None: raise
+                    tg = _t()
+                    delay = backoff(attempt, RETRY_BASE_MS / 1000)
+                    if attempt + 1 >= RETRY_MAX or time.monotonic() + delay >= deadline:
+                        tg.gave_up += 1
+                        raise
+                    attempt += 1; tg.retries += 1
+                    _log("WARNING", "db_retry", target=tg.name, tool=fn.__name__, kind=kind,
+                         attempt=attempt, sleep_ms=int(delay * 1000), error=str(e))
+                    with tracing.phase("retry_wait"):
+                        time.sleep(delay)
+        finally:
+            _in_retry.reset(token)
+    return wrapper
+
 # ---- Guards & RBAC ----
 _select_only = re.compile(r"^\s*select\b", re.IGNORECASE | re.DOTALL)
 _banned_kw   = re.compile(r"\b(insert|update|delete|drop|alter|truncate|exec|merge|create)\b", re.IGNORECASE)
@@ -56,30 +349,36 @@ _offset_pat  = re.compile(r"\boffset\s+\d+\s+rows\b", re.IGNORECASE)
 _fetch_pat   = re.compile(r"\bfetch\s+next\s+\d+\s+rows\s+only\b", re.IGNORECASE)
 _top_pat     = re.compile(r"\btop\s+\d+\b", re.IGNORECASE)
 
-_DENY_PATTERNS_RE = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in DENY_PATTERNS]
-
+@tracing.timed("guard")
 def ensure_safe_sql(sql: str):
     s = sql.strip()
     if not _select_only.match(s): raise ValueError("Nur SELECT-Statements sind erlaubt.")
     if ";" in s: raise ValueError("Nur ein einzelnes Statement ohne ';' ist erlaubt.")
     if _banned_kw.search(s): raise ValueError("Nur lesender Zugriff: DDL/DML/EXEC sind verboten.")
-    for rx in _DENY_PATTERNS_RE:
+    for rx in _t().deny_patterns_re:
         if rx.search(s): raise ValueError("Query verletzt eine gesperrte Muster-Regel (DENY_PATTERNS).")
     _block_denied_columns_in_sql(s)
 
+@tracing.timed("guard")
 def ensure_table_allowed(table: str):
+    _check_table_allowed(table)
+
+def _check_table_allowed(table: str):
+    """Ungemessen – der Katalog prüft beim Refresh jede Tabelle (sonst ein guard-Span je Tabelle)."""
+    allow_tables, allow_schemas = _t().allow_tables, _t().allow_schemas
     # Whitelist Tabellen
-    if ALLOW_TABLES:
+    if allow_tables:
         t = table.strip("[]")
-        if t in ALLOW_TABLES: pass
-        elif "." not in t and f"dbo.{t}" in ALLOW_TABLES: pass
+        if t in allow_tables: pass
+        elif "." not in t and f"dbo.{t}" in allow_tables: pass
+        elif t.startswith("dbo.") and t[4:] in allow_tables: pass
         else: raise ValueError(f"Tabelle '{table}' ist nicht freigegeben.")
     # Whitelist Schemas
-    if ALLOW_SCHEMAS:
+    if allow_schemas:
         # akzeptiere schema.name oder nur name -> dann dbo
         schema, dot, name = table.partition(".")
         if not dot: schema = "dbo"
-        if schema.strip("[]") not in ALLOW_SCHEMAS:
+        if schema.strip("[]") not in allow_schemas:
             raise ValueError(f"Schema '{schema}' ist nicht freigegeben.")
 
 def _block_denied_columns_in_sql(sql: str):
@@ -90,9 +389,10 @@ def _block_denied_columns_in_sql(sql: str):
       - '*.column' (alle Tabellen)
       - 'column' (global, vorsichtig)
     """
-    if not DENY_COLUMNS: return
+    deny_columns = _t().deny_columns
+    if not deny_columns: return
     lowered = sql.lower()
-    for spec in DENY_COLUMNS:
+    for spec in deny_columns:
         s = spec.strip()
         if not s: continue
         parts = s.lower().split(".")
@@ -112,6 +412,12 @@ def _block_denied_columns_in_sql(sql: str):
         if re.search(pat, lowered, re.IGNORECASE):
             raise ValueError(f"Verbotene Spalte referenziert: '{spec}' (DENY_COLUMNS).")
 
+@tracing.timed("guard")
+def ensure_column_allowed(table: str, column: str):
+    schema, dot, name = table.strip().partition(".")
+    if not dot: schema, name = "dbo", schema
+    _block_denied_columns_in_sql(f"{schema.strip('[]')}.{name.strip('[]')}.{column}")
+
 # ---- Quoting-Helper ----
 def _quote_ident(table: str) -> str:
     t = table.strip().strip("[]")
@@ -149,11 +455,23 @@ class QueryResult(BaseModel):
     row_count: int
     truncated: bool
     execution_ms: int
+    sampling: Optional[Dict[str, Any]] = None
+    cached: bool = False
+    deferred: Optional[Dict[str, str]] = None   # LOB-Spalte -> "length" | "preview" (Rest per fetch_blob)
 
 # ---- Tools ----
+@_resilient
 def tool_tables() -> List[str]:
-    if ALLOW_TABLES: return sorted(ALLOW_TABLES)
-    with _connect() as c:
+    if _all_targets():
+        # ein Katalog über alle Ziele: "ziel:schema.tabelle" (als table-Parameter direkt nutzbar)
+        out: List[str] = []
+        for name in _targets:
+            with use_target(name):
+                out += [f"{name}:{t}" for t in tool_tables()]
+        return out
+    allow = _t().allow_tables
+    if allow: return sorted(allow)
+    with _connection() as c:
         cur = c.cursor()
         cur.execute("""
             SELECT CONCAT(TABLE_SCHEMA, '.', TABLE_NAME)
@@ -163,11 +481,12 @@ def tool_tables() -> List[str]:
         """)
         return [r[0] for r in cur.fetchall()]
 
+@_resilient
 def tool_columns(table: str) -> List[Dict[str, Any]]:
     ensure_table_allowed(table)
     schema, dot, name = table.partition(".")
     if not dot: schema, name = "dbo", schema
-    with _connect() as c:
+    with _connection() as c:
         cur = c.cursor(as_dict=True)
         cur.execute("""
             SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, CHARACTER_MAXIMUM_LENGTH, ORDINAL_POSITION
@@ -183,52 +502,654 @@ def tool_columns(table: str) -> List[Dict[str, Any]]:
             "position": r["ORDINAL_POSITION"],
         } for r in cur.fetchall()]
 
+# ---- Schema-Katalog (gecacht, inkrementell) ----
+def _table_allowed(table: str) -> bool:
+    try:
+        _check_table_allowed(table); return True
+    except ValueError:
+        return False
+
+_targets.update((name, Target(name)) for name in TARGETS)
+
+def _open_disk_cache(tg: Target) -> Optional[DiskCache]:
+    if not DISK_CACHE_PATH: return None
+    try:
+        # Guards gehören zum scope: Ziele auf dieselbe DB mit anderen Freigaben teilen keine Einträge
+        guards = json.dumps([sorted(tg.allow_tables), sorted(tg.allow_schemas), tg.deny_columns, tg.deny_patterns])
+        scope = f"{tg.server}/{tg.database}/{hashlib.sha1(guards.encode('utf-8')).hexdigest()[:12]}"
+        return DiskCache(DISK_CACHE_PATH, scope=scope, max_bytes=DISK_CACHE_MAX_MB * 1024 * 1024)
+    except Exception as e:
+        _log("ERROR", "disk_cache_unavailable", path=DISK_CACHE_PATH, target=tg.name, error=str(e))
+        return None
+
+_DISK_VERSIONED = ("examples", "results")   # Namensräume, die an die Schema-Version gebunden sind
+
+def _schema_version(conn) -> str:
+    """Billige Schema-Version: Anzahl + letzte Änderung aller Tabellen/Views."""
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*), MAX(modify_date) FROM sys.objects WHERE type IN ('U', 'V')")
+    n, md = cur.fetchone()
+    return f"{n}:{md.isoformat() if hasattr(md, 'isoformat') else md}"
+
+def _schema_catalog(force: bool = False) -> SchemaCatalog:
+    """Katalog des aktuellen Ziels; gleicht ihn höchstens alle SCHEMA_REFRESH_S Sekunden mit der DB ab."""
+    tg = _t()
+    catalog, disk = tg.catalog, tg.disk
+    if force or catalog.is_stale(SCHEMA_REFRESH_S):
+        t0 = time.time()
+        from_disk = snap_missing = False
+        if disk is not None and not catalog.tables:
+            snap = disk.get("catalog", "tables")
+            if snap:
+                catalog.load_snapshot(snap); from_disk = True
+            else:
+                snap_missing = True
+        with _connection() as c:
+            info = catalog.refresh(c)
+            ver = _schema_version(c) if disk is not None else None
+        if disk is not None:
+            if ver != tg.schema_ver:
+                purged = disk.validate(ver, _DISK_VERSIONED)
+                if purged: _log("INFO", "disk_cache_invalidated", target=tg.name, entries=purged, schema_version=ver)
+                tg.schema_ver = ver
+            if info["loaded"] or info["dropped"] or snap_missing:   # unverändert: kein Schreiben je Refresh
+                disk.put("catalog", "tables", catalog.snapshot())
+        if info["loaded"] or info["dropped"] or from_disk:
+            _log("INFO", "schema_catalog_refreshed", target=tg.name, ms=int((time.time() - t0) * 1000),
+                 from_disk=from_disk, **info)
+    return catalog
+
+@_resilient
+def tool_search_schema(q: str, limit: int = 20, kind: str = None) -> Dict[str, Any]:
+    """Ranglistensuche über Tabellen-/Spaltennamen und Beschreibungen (invertierter Index)."""
+    if kind not in (None, "", "table", "column"):
+        raise ValueError("Parameter 'kind' muss 'table' oder 'column' sein.")
+    if _all_targets():
+        # über alle Ziele suchen, Treffer mit Ziel markieren und gemeinsam nach Score ordnen
+        merged, indexed, us = [], 0, 0
+        for name in _targets:
+            with use_target(name):
+                part = tool_search_schema(q, limit, kind)
+            merged += [{"target": name, **hit} for hit in part["results"]]
+            indexed += part["indexed"]; us += part["search_us"]
+        merged.sort(key=lambda hit: -hit["score"])
+        return {"query": q, "results": merged[:max(1, limit)], "indexed": indexed, "search_us": us}
+    cat = _schema_catalog()
+    t0 = time.perf_counter()
+    hits = cat.index.search(q, limit=max(1, min(limit, _t().row_limit)), kind=kind or None)
+    us = int((time.perf_counter() - t0) * 1_000_000)
+    return {"query": q, "results": hits, "indexed": len(cat.index), "search_us": us}
+
 def _apply_top_limit(sql: str) -> str:
     # Kein TOP injizieren, wenn bereits paginiert
     if _offset_pat.search(sql) or _fetch_pat.search(sql): return sql
     if _top_pat.search(sql): return sql
-    return re.sub(r"^\s*select\b", f"SELECT TOP {ROW_LIMIT}", sql, flags=re.IGNORECASE)
+    return re.sub(r"^\s*select\b", f"SELECT TOP {_t().row_limit}", sql, flags=re.IGNORECASE)
+
+# ---- LOB-Spalten zurückstellen (BINARY_MODE=placeholder) ----
+_ident = r"(?:\[(?:[^\]]|\]\])+\]|[\w$#@]+)"
+_simple_select = re.compile(
+    rf"^\s*select\s+(?:top\s+\d+\s+)?(?P<proj>.+?)\s+from\s+(?P<table>{_ident}(?:\s*\.\s*{_ident})?)"
+    rf"(?P<tail>\s+(?:where|order|group|tablesample|with|option)\b.*)?\s*$",
+    re.IGNORECASE | re.DOTALL)
 
+def _ident_name(part: str) -> str:
+    p = part.strip()
+    return p[1:-1].replace("]]", "]") if p.startswith("[") else p
+
+def _lob_expr(m: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Ersatzausdruck für eine LOB-Spalte: (SQL, Art) oder None, wenn die Spalte unverändert bleibt."""
+    col_q = f"[{m['column'].replace(']', ']]')}]"
+    dtype = (m.get("type") or "").lower()
+    if dtype == "image" or (dtype == "varbinary" and m.get("max_len") == -1):
+        return f"DATALENGTH({col_q})", "length"
+    if LOB_PREVIEW_CHARS > 0 and _is_lob(m):
+        src = f"CAST({col_q} AS NVARCHAR(MAX))" if dtype == "xml" else col_q
+        return f"SUBSTRING({src}, 1, {LOB_PREVIEW_CHARS + 1})", "preview"   # +1: Kürzung erkennbar
+    return None
+
+def _defer_lobs(sql: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Schreibt die Projektion einfacher Einzeltabellen-SELECTs so um, dass LOB-Werte nicht übertragen werden:
+    image/varbinary(max) -> DATALENGTH, Text-LOBs -> SUBSTRING. Alles andere bleibt unverändert.
+    """
+    if BINARY_MODE != "placeholder": return sql, {}
+    mt = _simple_select.match(sql)
+    if not mt: return sql, {}
+    table = ".".join(_ident_name(p) for p in re.findall(_ident, mt.group("table")))
+    proj, deferred = _defer_projection(table, mt.group("proj"))
+    if not deferred: return sql, {}
+    return sql[:mt.start("proj")] + proj + sql[mt.end("proj"):], deferred
+
+def _defer_projection(table: str, proj: str) -> Tuple[str, Dict[str, str]]:
+    """Projektion ('*' oder einfache Spaltenliste) mit ersetzten LOB-Spalten; sonst unverändert."""
+    proj = proj.strip()
+    if BINARY_MODE != "placeholder": return proj, {}
+    if "(" in proj or re.match(r"distinct\b", proj, re.IGNORECASE) or re.search(r"\bfrom\b", proj, re.IGNORECASE):
+        return proj, {}
+    try:
+        meta = _schema_catalog().columns(table)
+    except Exception:
+        return proj, {}
+    if not meta: return proj, {}
+    by_name = {m["column"].lower(): m for m in meta}
+    items = [f"[{m['column'].replace(']', ']]')}]" for m in meta] if proj == "*" else [p.strip() for p in proj.split(",")]
+    out, deferred = [], {}
+    for item in items:
+        m = by_name.get(_ident_name(item).lower()) if re.fullmatch(_ident, item) else None
+        lob = _lob_expr(m) if m else None
+        if lob is None:
+            out.append(item); continue
+        out.append(f"{lob[0]} AS [{m['column'].replace(']', ']]')}]")
+        deferred[m["column"]] = lob[1]
+    return (", ".join(out), deferred) if deferred else (proj, {})
+
+def _apply_deferred(rows: List[Dict[str, Any]], deferred: Dict[str, str]):
+    for row in rows:
+        for col, kind in deferred.items():
+            v = row.get(col)
+            if v is None: continue
+            if kind == "length": row[col] = f"[[BINARY {v} bytes]]"
+            elif len(v) > LOB_PREVIEW_CHARS: row[col] = v[:LOB_PREVIEW_CHARS] + "…"
+
+def _result_cache_enabled(tg: Target) -> bool:
+    return tg.disk is not None and DISK_CACHE_RESULT_TTL > 0 and tg.schema_ver is not None
+
+@_resilient
 def tool_query(sql: str) -> QueryResult:
     ensure_safe_sql(sql)
     sql_eff = _apply_top_limit(sql.strip())
+    tg = _t()
+    if _result_cache_enabled(tg):
+        hit = tg.disk.get("results", sql_eff, tg.schema_ver)
+        if hit is not None: return QueryResult(**{**hit, "cached": True})
+    sql_exec, deferred = _defer_lobs(sql_eff)
     t0 = time.time()
-    with _connect() as c:
-        c.cursor().execute(f"SET LOCK_TIMEOUT {QUERY_TIMEOUT * 1000};")
+    with _connection() as c:
+        c.cursor().execute(f"SET LOCK_TIMEOUT {tg.query_timeout * 1000};")
         cur = c.cursor()
-        cur.execute(sql_eff)
+        cur.execute(sql_exec)
         cols = [d[0] for d in cur.description]
         rows = cur.fetchall()
     ms = int((time.time() - t0) * 1000)
-    dict_rows = [_jsonify_row(cols, r) for r in rows]
-    truncated = len(dict_rows) >= ROW_LIMIT
-    return QueryResult(columns=cols, rows=dict_rows, row_count=len(dict_rows), truncated=truncated, execution_ms=ms)
+    with tracing.phase("jsonify"):
+        dict_rows = [_jsonify_row(cols, r) for r in rows]
+        if deferred: _apply_deferred(dict_rows, deferred)
+    truncated = len(dict_rows) >= tg.row_limit
+    res = QueryResult(columns=cols, rows=dict_rows, row_count=len(dict_rows), truncated=truncated, execution_ms=ms,
+                      deferred=deferred or None)
+    if _result_cache_enabled(tg):
+        # "heiß" = mindestens zum zweiten Mal angefragt; nur kleine Ergebnisse persistieren
+        seen = tg.hot_seen[sql_eff] = tg.hot_seen.get(sql_eff, 0) + 1
+        if len(tg.hot_seen) > 10000: tg.hot_seen.clear()
+        if seen >= 2 and len(json.dumps(dict_rows, default=str)) <= DISK_CACHE_RESULT_KB * 1024:
+            tg.disk.put("results", sql_eff, res.model_dump(), tg.schema_ver, DISK_CACHE_RESULT_TTL)
+    return res
 
-def tool_sample(table: str, n: int = 50) -> QueryResult:
+def _sample_projection(table: str, columns: Optional[List[str]]) -> str:
+    if not columns: return "*"
+    meta = {m["column"].lower(): m["column"] for m in _catalog_columns(table)}
+    out = []
+    for col in columns:
+        name = meta.get(col.strip().strip("[]").lower())
+        if name is None: raise ValueError(f"Spalte '{col}' existiert nicht in '{table}'.")
+        ensure_column_allowed(table, name)
+        out.append(f"[{name.replace(']', ']]')}]")
+    return ", ".join(out)
+
+def _table_size(table: str) -> Tuple[Optional[int], Optional[int]]:
+    """(In-Row-Datenseiten, Zeilen) aus den Katalog-Views; (None, None) wenn nicht ermittelbar."""
+    try:
+        with _connection() as c:
+            cur = c.cursor()
+            cur.execute("""
+                SELECT SUM(au.used_pages), SUM(p.rows)
+                FROM sys.partitions p
+                JOIN sys.allocation_units au ON au.container_id = p.hobt_id AND au.type = 1
+                WHERE p.object_id = OBJECT_ID(%s) AND p.index_id IN (0, 1)
+            """, (_quote_ident(table),))
+            row = cur.fetchone()
+        return (row[0], row[1]) if row else (None, None)
+    except Exception:
+        return None, None
+
+@_resilient
+def tool_sample(table: str, n: int = 50, mode: str = "top", seed: Optional[int] = None,
+                columns: Optional[List[str]] = None, max_pages: Optional[int] = None) -> QueryResult:
+    """
+    mode="top":    SELECT TOP n (bisheriges Verhalten, Präfix des Clustered Index).
+    mode="random": Zufallsstichprobe, reproduzierbar über seed, Lesekosten durch max_pages begrenzt.
+      - kleine Tabellen (<= max_pages): komplette Tabelle, Reihenfolge per CHECKSUM(..., seed)
+      - große Tabellen: TABLESAMPLE (p PERCENT) REPEATABLE (seed), p so dass ~max_pages Seiten gelesen werden
+      - Fallback (TABLESAMPLE zu wenige Zeilen / keine Metadaten): Checksum-Filter mit TOP n
+    columns: optionale Projektion, um breite BLOB/Text-Spalten nicht mitzuziehen.
+    """
     ensure_table_allowed(table)
-    n = max(1, min(n, ROW_LIMIT))
+    n = max(1, min(n, _t().row_limit))
     qname = _quote_ident(table)
-    sql = f"SELECT TOP {n} * FROM {qname}"
-    return tool_query(sql)
+    proj = _sample_projection(table, columns)
+    if mode == "top":
+        return tool_query(f"SELECT TOP {n} {proj} FROM {qname}")
+    if mode != "random":
+        raise ValueError("Parameter 'mode' muss 'top' oder 'random' sein.")
+
+    seed = int(seed) if seed is not None else int.from_bytes(os.urandom(3), "big")
+    max_pages = max(1, int(max_pages or SAMPLE_MAX_PAGES))
+    pages, rows = _table_size(table)
+    shuffle = f"CHECKSUM(BINARY_CHECKSUM(*), {seed})"
+    info: Dict[str, Any] = {"mode": "random", "seed": seed, "max_pages": max_pages, "table_pages": pages}
 
+    if pages is not None and pages <= max_pages:
+        info["method"] = "full_shuffle"
+        res = tool_query(f"SELECT TOP {n} {proj} FROM {qname} ORDER BY {shuffle}")
+    else:
+        res = None
+        if pages:
+            pct = max(0.0001, round(100.0 * max_pages / pages, 4))
+            info.update(method="tablesample", sample_pct=pct)
+            res = tool_query(f"SELECT TOP {n} {proj} FROM {qname} "
+                             f"TABLESAMPLE ({pct} PERCENT) REPEATABLE ({seed}) ORDER BY {shuffle}")
+        if res is None or res.row_count < n:
+            # Jede k-te Zeile (per Checksum) – TOP n bricht den Scan nach ~n*k Zeilen ab
+            per_page = (rows / pages) if (rows and pages) else 100
+            k = max(1, int(max_pages * per_page // n))
+            info.update(method="checksum_filter", modulus=k)
+            res = tool_query(f"SELECT TOP {n} {proj} FROM {qname} WHERE ABS({shuffle} % {k}) = 0")
+    res.sampling = info
+    return res
+
+@_resilient
 def tool_paginate(sql: str, offset: int = 0, fetch: int = 100) -> QueryResult:
     ensure_safe_sql(sql)
-    fetch = max(1, min(fetch, ROW_LIMIT))
+    fetch = max(1, min(fetch, _t().row_limit))
     if re.search(r"\border\s+by\b", sql, re.IGNORECASE) is None:
         sql = f"{sql.rstrip()} ORDER BY 1"
     paged = f"{sql} OFFSET {max(0, offset)} ROWS FETCH NEXT {fetch} ROWS ONLY"
     return tool_query(paged)
 
+@_resilient
 def tool_stats(table: str, sample_n: int = 5) -> Dict[str, Any]:
     ensure_table_allowed(table)
     qname = _quote_ident(table)
-    with _connect() as c:
+    with _connection() as c:
         cur = c.cursor()
         cur.execute(f"SELECT COUNT(*) FROM {qname}")
         total = cur.fetchone()[0]
     sample = tool_sample(table, sample_n).model_dump()
     return {"table": table, "row_count": total, "sample": sample}
 
+def _fetch_dicts(cur, sql: str, deferred: Optional[Dict[str, str]] = None) -> Tuple[List[str], List[Dict[str, Any]]]:
+    cur.execute(sql)
+    cols = [d[0] for d in cur.description]
+    raw = cur.fetchall()
+    with tracing.phase("jsonify"):
+        rows = [_jsonify_row(cols, r) for r in raw]
+        if deferred: _apply_deferred(rows, deferred)
+    return cols, rows
+
+def _watch_version(cur, mode: str, qname: str) -> Tuple[Any, Any]:
+    """Die billige Versionsprüfung: (aktuelle Version, kleinste noch gültige Version bzw. None)."""
+    if mode == "change_tracking":
+        cur.execute("SELECT CHANGE_TRACKING_CURRENT_VERSION(), CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID(%s))",
+                    (qname,))
+        ver, min_valid = cur.fetchone()
+        return ver, min_valid
+    if mode == "rowversion":
+        # nicht @@DBTS: Zeilen offener Transaktionen ab dieser Marke werden beim nächsten Mal mitgelesen
+        cur.execute("SELECT MIN_ACTIVE_ROWVERSION()")
+        return bytes(cur.fetchone()[0]).hex(), None
+    return None, None
+
+@_resilient
+def tool_watch(table: str, columns: Optional[List[str]] = None, where: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Inkrementell aktualisiertes Ergebnis von SELECT <columns> FROM table [WHERE where].
+    - Change Tracking aktiv: Versionsprüfung CHANGE_TRACKING_CURRENT_VERSION(), Delta per CHANGETABLE(CHANGES ...)
+    - rowversion-Spalte:     Versionsprüfung MIN_ACTIVE_ROWVERSION(), Delta per WHERE [rv] >= letzte Marke
+    - sonst / ohne Primärschlüssel: volle Ausführung und Vergleich mit dem letzten Ergebnis
+    Unveränderte Daten kosten nur die Versionsprüfung; 'changed' meldet, ob sich das Ergebnis geändert hat.
+    Primärschlüsselspalten werden immer mitgeliefert (Schlüssel für das Zusammenführen).
+    """
+    tg = _t()
+    ensure_table_allowed(table)
+    qname = _quote_ident(table)
+    t = ".".join(p.strip().strip("[]") for p in table.strip().split("."))
+    if where: ensure_safe_sql(f"SELECT 1 FROM {qname} WHERE {where}")
+    cond = f"({where})" if where else "1 = 1"
+    meta = _catalog_columns(table)
+    pk = _schema_catalog().primary_key(t) or []
+    if columns:
+        wanted = {c.strip().strip("[]").lower() for c in columns}
+        columns = list(columns) + [c for c in pk if c.lower() not in wanted]
+    proj, deferred = _defer_projection(t, _sample_projection(table, columns))
+    key = (t, tuple(columns or ()), where or "")
+    pk_q = [f"[{c.replace(']', ']]')}]" for c in pk]
+    rv = next((m["column"] for m in meta if (m["type"] or "").lower() in ("timestamp", "rowversion")), None)
+    t0 = time.time()
+
+    prev = tg.watch_cache.peek(key)
+    with _connection() as c:
+        cur = c.cursor()
+        if prev is not None:
+            mode = prev[1]["mode"]
+        else:
+            mode = "full"
+            if pk:
+                cur.execute("SELECT COUNT(*) FROM sys.change_tracking_tables WHERE object_id = OBJECT_ID(%s)", (qname,))
+                mode = "change_tracking" if cur.fetchone()[0] else ("rowversion" if rv else "full")
+        version, min_valid = _watch_version(cur, mode, qname)
+
+        # unverändert: nur die Versionsprüfung
+        if prev is not None and mode != "full" and version == prev[0]:
+            state = tg.watch_cache.get(key, version)   # zählt als Treffer
+            return _watch_response(table, state, False, 0, 0, True, t0)
+
+        cur.execute(f"SET LOCK_TIMEOUT {tg.query_timeout * 1000};")
+        state = prev[1] if prev is not None else None
+        upserted = deleted = 0
+        incremental = state is not None and mode != "full" and state["complete"] and \
+            not (mode == "change_tracking" and (min_valid is None or min_valid > state["since"]))
+
+        # Deltas höchstens row_limit Zeilen: mehr Änderungen -> volles Neulesen (ebenfalls mit TOP) statt alles holen
+        cap = tg.row_limit + 1
+        changed: List[Dict[str, Any]] = []
+        if incremental:
+            if mode == "change_tracking":
+                cur.execute(f"SELECT TOP {cap} {', '.join('ct.' + q for q in pk_q)} "
+                            f"FROM CHANGETABLE(CHANGES {qname}, {int(state['since'])}) AS ct")
+                touched = {tuple(_jsonify_value(v) for v in r) for r in cur.fetchall()}
+                incremental = len(touched) < cap
+                changed_sql = (f"SELECT TOP {cap} {proj}, CASE WHEN {cond} THEN 1 ELSE 0 END AS [__in] FROM {qname} "
+                               f"WHERE EXISTS (SELECT 1 FROM CHANGETABLE(CHANGES {qname}, {int(state['since'])}) AS ct "
+                               f"WHERE {' AND '.join(f'ct.{q} = {qname}.{q}' for q in pk_q)})") if touched else None
+            else:
+                touched = None
+                changed_sql = (f"SELECT TOP {cap} {proj}, CASE WHEN {cond} THEN 1 ELSE 0 END AS [__in] FROM {qname} "
+                               f"WHERE [{rv.replace(']', ']]')}] >= 0x{state['since']}")
+            if incremental and changed_sql:
+                _, changed = _fetch_dicts(cur, changed_sql, deferred)
+                incremental = len(changed) < cap
+
+        if incremental:
+            rows: Dict[tuple, Dict[str, Any]] = dict(state["rows"])
+            present = set()
+            for r in changed:
+                k = tuple(r[c] for c in pk)
+                present.add(k)
+                inside = r.pop("__in")
+                if inside:
+                    if rows.get(k) != r: rows[k] = r; upserted += 1
+                elif rows.pop(k, None) is not None:
+                    deleted += 1
+            if touched is not None:
+                for k in touched - present:                  # geändert, aber nicht mehr vorhanden
+                    if rows.pop(k, None) is not None: deleted += 1
+            else:
+                # rowversion sieht keine Löschungen: Zeilenzahl prüfen, nur bei Abweichung Schlüssel abgleichen
+                cur.execute(f"SELECT COUNT_BIG(*) FROM {qname} WHERE {cond}")
+                if cur.fetchone()[0] != len(rows):
+                    _, keys = _fetch_dicts(cur, f"SELECT {', '.join(pk_q)} FROM {qname} WHERE {cond}")
+                    alive = {tuple(r[c] for c in pk) for r in keys}
+                    for k in [k for k in rows if k not in alive]:
+                        del rows[k]; deleted += 1
+            complete = len(rows) <= tg.row_limit
+            state = {**state, "since": version, "rows": rows, "complete": complete}
+            changed_flag = bool(upserted or deleted)
+        else:
+            cols, fetched = _fetch_dicts(cur, f"SELECT TOP {cap} {proj} FROM {qname} WHERE {cond}",
+                                         deferred)
+            complete = len(fetched) <= tg.row_limit
+            fetched = fetched[:tg.row_limit]
+            rows = {tuple(r[c] for c in pk) if pk else (i,): r for i, r in enumerate(fetched)}
+            changed_flag = state is None or list(state["rows"].values()) != fetched
+            upserted = len(fetched) if state is None else 0
+            state = {"mode": mode, "since": version, "rows": rows, "columns": cols, "complete": complete,
+                     "deferred": deferred}
+
+    tg.watch_cache.put(key, version, state)
+    return _watch_response(table, state, changed_flag, upserted, deleted, False, t0)
+
+def _watch_response(table: str, state: Dict[str, Any], changed: bool, upserted: int, deleted: int,
+                    version_check_only: bool, t0: float) -> Dict[str, Any]:
+    rows = list(state["rows"].values())[:_t().row_limit]   # Deltas können über row_limit hinaus wachsen
+    return {
+        "table": table, "mode": state["mode"], "changed": changed,
+        "upserted": upserted, "deleted": deleted, "version_check_only": version_check_only,
+        "version": str(state["since"]) if state["since"] is not None else None,
+        "result": QueryResult(columns=state["columns"], rows=rows, row_count=len(rows),
+                              truncated=not state["complete"], execution_ms=int((time.time() - t0) * 1000),
+                              deferred=state.get("deferred") or None).model_dump(),
+    }
+
+def _catalog_columns(table: str) -> List[Dict[str, Any]]:
+    """Spalten-Metadaten aus dem Katalog (ohne DB-Roundtrip), Fallback: INFORMATION_SCHEMA."""
+    t = ".".join(p.strip().strip("[]") for p in table.strip().split("."))
+    cols = _schema_catalog().columns(t)
+    return cols if cols is not None else tool_columns(table)
+
+def _table_version(cur, table: str):
+    """
+    Billiger Änderungsstempel einer Tabelle: Zeilenzahl + DML-Zähler aus den DMVs.
+    None, wenn die DMVs nicht lesbar sind (fehlendes VIEW DATABASE STATE).
+    """
+    try:
+        cur.execute("""
+            SELECT (SELECT SUM(row_count) FROM sys.dm_db_partition_stats
+                    WHERE object_id = OBJECT_ID(%s) AND index_id IN (0, 1)),
+                   (SELECT SUM(leaf_insert_count + leaf_delete_count + leaf_update_count + leaf_ghost_count)
+                    FROM sys.dm_db_index_operational_stats(DB_ID(), OBJECT_ID(%s), NULL, NULL))
+        """, (_quote_ident(table), _quote_ident(table)))
+        row = cur.fetchone()
+        return tuple(row) if row and row[0] is not None else None
+    except Exception:
+        return None
+
+def _profile_expr(col_q: str, dtype: str) -> str:
+    # Typen, auf denen MIN/MAX/GROUP BY nicht erlaubt sind, vorher casten
+    if dtype in ("text", "ntext", "xml"): return f"CAST({col_q} AS NVARCHAR(4000))"
+    if dtype == "image": return f"CAST({col_q} AS VARBINARY(8000))"
+    if dtype == "bit": return f"CAST({col_q} AS TINYINT)"
+    return col_q
+
+@_resilient
+def tool_profile_column(table: str, column: str, top_k: int = 10,
+                        sample_pct: float = None, seed: int = None) -> Dict[str, Any]:
+    """
+    Spaltenprofil: Top-k-Werte, NULL-Anteil, Distinct-Schätzung, Min/Max.
+    - sample_pct: optional TABLESAMPLE (Prozent) statt Full Scan, seed -> REPEATABLE.
+    - Ergebnisse werden je Tabelle/Spalte gecacht, bis sich die Änderungszähler ändern.
+    """
+    tg = _t()
+    ensure_table_allowed(table)
+    ensure_column_allowed(table, column)
+    meta = {m["column"].lower(): m for m in _catalog_columns(table)}
+    m = meta.get(column.strip("[]").lower())
+    if m is None: raise ValueError(f"Spalte '{column}' existiert nicht in '{table}'.")
+    top_k = max(1, min(top_k, tg.row_limit))
+    if sample_pct is not None and not (0 < sample_pct <= 100):
+        raise ValueError("Parameter 'sample_pct' muss zwischen 0 und 100 liegen.")
+
+    qname = _quote_ident(table)
+    col_q = f"[{m['column'].replace(']', ']]')}]"
+    expr = _profile_expr(col_q, (m["type"] or "").lower())
+    src = qname
+    if sample_pct is not None:
+        src += f" TABLESAMPLE ({float(sample_pct)} PERCENT)"
+        if seed is not None: src += f" REPEATABLE ({int(seed)})"
+
+    key = (table, m["column"], top_k, sample_pct, seed)
+    t0 = time.time()
+    with _connection() as c:
+        cur = c.cursor()
+        version = _table_version(cur, table)
+        cached = tg.profile_cache.get(key, version)
+        if cached is not None:
+            return {**cached, "cached": True, "execution_ms": int((time.time() - t0) * 1000)}
+
+        cur.execute(f"SET LOCK_TIMEOUT {tg.query_timeout * 1000};")
+        agg = "SELECT COUNT_BIG(*), COUNT_BIG({e}), {d}, MIN({e}), MAX({e}) FROM {src}"
+        distinct_method = "approx" if tg.approx_distinct else "exact"
+        try:
+            d = f"APPROX_COUNT_DISTINCT({expr})" if tg.approx_distinct else f"COUNT(DISTINCT {expr})"
+            cur.execute(agg.format(e=expr, d=d, src=src))
+        except Exception as e:
+            # nur 195 ("… is not a recognized built-in function name") heißt: Server kennt die Funktion nicht;
+            # alles andere (Deadlock, Verbindung, Rechte) weiterreichen, damit _resilient entscheidet
+            if not tg.approx_distinct or error_code(e) != 195: raise
+            tg.approx_distinct = False; distinct_method = "exact"
+            cur.execute(agg.format(e=expr, d=f"COUNT(DISTINCT {expr})", src=src))
+        total, non_null, distinct, vmin, vmax = cur.fetchone()
+
+        cur.execute(f"SELECT TOP {top_k} {expr}, COUNT_BIG(*) AS cnt FROM {src} "
+                    f"GROUP BY {expr} ORDER BY cnt DESC")
+        top = [{"value": _jsonify_value(v), "count": n} for v, n in cur.fetchall()]
+
+    nulls = (total or 0) - (non_null or 0)
+    res = {
+        "table": table, "column": m["column"], "type": m["type"],
+        "rows": total, "nulls": nulls,
+        "null_ratio": round(nulls / total, 4) if total else None,
+        "distinct_estimate": distinct, "distinct_method": distinct_method,
+        "min": _jsonify_value(vmin), "max": _jsonify_value(vmax),
+        "top_values": top,
+        "sampled": sample_pct is not None, "sample_pct": sample_pct,
+    }
+    tg.profile_cache.put(key, version, res)
+    return {**res, "cached": False, "execution_ms": int((time.time() - t0) * 1000)}
+
+_LOB_TYPES = ("text", "ntext", "image", "xml")
+
+def _is_lob(m: Dict[str, Any]) -> bool:
+    # (n)varchar(max)/varbinary(max) melden CHARACTER_MAXIMUM_LENGTH = -1
+    return (m.get("type") or "").lower() in _LOB_TYPES or m.get("max_len") == -1
+
+def _summarize_values(values: List[Any], top_k: int) -> Dict[str, Any]:
+    non_null = [v for v in values if v is not None]
+    counts: Dict[Any, int] = {}
+    for v in non_null:
+        k = bytes(v) if isinstance(v, (bytearray, memoryview)) else v
+        counts[k] = counts.get(k, 0) + 1
+    try:
+        vmin, vmax = (min(non_null), max(non_null)) if non_null else (None, None)
+    except TypeError:
+        vmin = vmax = None
+    top = sorted(counts.items(), key=lambda kv: -kv[1])[:top_k]
+    return {
+        "min": _jsonify_value(vmin), "max": _jsonify_value(vmax),
+        "null_ratio": round(1 - len(non_null) / len(values), 4) if values else None,
+        "distinct_in_sample": len(counts),
+        "representative_values": [{"value": _jsonify_value(v), "rows": n} for v, n in top],
+    }
+
+def _histogram_summaries(cur, table: str, top_k: int) -> Dict[str, Dict[str, Any]]:
+    """Je Spalte (führende Spalte einer Statistik) Zusammenfassung aus dem Histogramm."""
+    qname = _quote_ident(table)
+    cur.execute("""
+        SELECT s.stats_id, s.name, c.name, sp.last_updated, sp.rows, sp.rows_sampled,
+               sp.steps, sp.modification_counter
+        FROM sys.stats s
+        JOIN sys.stats_columns sc ON sc.object_id = s.object_id AND sc.stats_id = s.stats_id
+                                 AND sc.stats_column_id = 1
+        JOIN sys.columns c ON c.object_id = sc.object_id AND c.column_id = sc.column_id
+        CROSS APPLY sys.dm_db_stats_properties(s.object_id, s.stats_id) sp
+        WHERE s.object_id = OBJECT_ID(%s)
+    """, (qname,))
+    # pro Spalte die Statistik mit der größten Stichprobe (bei Gleichstand die neueste)
+    rank = lambda r: (r[5] or 0, r[3] or datetime.datetime.min)
+    best: Dict[str, tuple] = {}
+    for row in cur.fetchall():
+        if row[2] not in best or rank(row) > rank(best[row[2]]):
+            best[row[2]] = row
+    if not best: return {}
+
+    ids = sorted({r[0] for r in best.values()})
+    cur.execute(f"""
+        SELECT s.stats_id, h.step_number, CAST(h.range_high_key AS NVARCHAR(4000)),
+               h.range_rows, h.equal_rows, h.distinct_range_rows
+        FROM sys.stats s
+        CROSS APPLY sys.dm_db_stats_histogram(s.object_id, s.stats_id) h
+        WHERE s.object_id = OBJECT_ID(%s) AND s.stats_id IN ({", ".join(str(int(i)) for i in ids)})
+        ORDER BY s.stats_id, h.step_number
+    """, (qname,))
+    steps: Dict[int, List[tuple]] = {}
+    for r in cur.fetchall(): steps.setdefault(r[0], []).append(r)
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for col, (sid, sname, _, updated, rows, sampled, nsteps, mods) in best.items():
+        hist = steps.get(sid, [])
+        keyed = [h for h in hist if h[2] is not None]
+        nulls = sum(h[4] for h in hist if h[2] is None)
+        distinct = sum(h[5] for h in keyed) + sum(1 for h in keyed if h[4] > 0)
+        top = sorted(keyed, key=lambda h: -h[4])[:top_k]
+        out[col] = {
+            "source": "histogram",
+            "statistic": sname,
+            "last_updated": _jsonify_value(updated),
+            "rows": rows, "rows_sampled": sampled, "modifications_since_update": mods,
+            "min": keyed[0][2] if keyed else None,
+            "max": keyed[-1][2] if keyed else None,
+            "null_ratio": round(nulls / rows, 4) if rows else None,
+            "distinct_estimate": int(round(distinct)),
+            "density": round(1 / distinct, 8) if distinct else None,
+            "representative_values": [{"value": h[2], "rows": h[4]} for h in top],
+        }
+    return out
+
+@_resilient
+def tool_column_stats(table: str, top_k: int = 5, sample_rows: int = 1000) -> Dict[str, Any]:
+    """
+    Spalten-Zusammenfassungen aus sys.stats / dm_db_stats_histogram – ohne Scan der Basistabelle.
+    Nur Spalten ohne Statistik werden per TABLESAMPLE (max. sample_rows Zeilen) angeschaut.
+    LOB-Spalten und DENY_COLUMNS werden übersprungen.
+    """
+    ensure_table_allowed(table)
+    top_k = max(1, min(top_k, 50))
+    sample_rows = max(1, min(sample_rows, _t().row_limit * 10))
+    meta = _catalog_columns(table)
+    qname = _quote_ident(table)
+    t0 = time.time()
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    with _connection() as c:
+        cur = c.cursor()
+        cur.execute(f"SET LOCK_TIMEOUT {_t().query_timeout * 1000};")
+        try:
+            hist = _histogram_summaries(cur, table, top_k)
+        except Exception as ex:
+            # dm_db_stats_histogram erst ab SQL Server 2016 SP1 CU2 bzw. fehlende Rechte
+            _log("INFO", "stats_histogram_unavailable", table=table, error=str(ex))
+            hist = {}
+
+        to_sample: List[str] = []
+        for m in meta:
+            col = m["column"]
+            try:
+                ensure_column_allowed(table, col)
+            except ValueError:
+                columns[col] = {"source": "skipped", "reason": "denied"}; continue
+            if col in hist:
+                columns[col] = hist[col]
+            elif _is_lob(m):
+                columns[col] = {"source": "skipped", "reason": "lob"}
+            else:
+                to_sample.append(col); columns[col] = {}   # Platz in Spaltenreihenfolge reservieren
+
+        if to_sample:
+            cols_q = ", ".join(f"[{col.replace(']', ']]')}]" for col in to_sample)
+            rows = []
+            for stmt in (f"SELECT TOP {sample_rows} {cols_q} FROM {qname} TABLESAMPLE ({sample_rows} ROWS)",
+                         f"SELECT TOP {sample_rows} {cols_q} FROM {qname}"):
+                cur.execute(stmt)
+                rows = cur.fetchall()
+                if rows: break   # TABLESAMPLE liefert bei kleinen Tabellen oft 0 Zeilen
+            for i, col in enumerate(to_sample):
+                columns[col] = {"source": "sample", "sample_rows": len(rows),
+                                **_summarize_values([r[i] for r in rows], top_k)}
+
+    return {"table": table, "columns": columns,
+            "sampled_columns": len(to_sample), "execution_ms": int((time.time() - t0) * 1000)}
+
+@_resilient
 def tool_columns_with_examples(table: str, n: int = 5) -> Dict[str, Any]:
     """
     Spalten-Metadaten + bis zu n Beispielwerte je Spalte.
@@ -238,11 +1159,15 @@ def tool_columns_with_examples(table: str, n: int = 5) -> Dict[str, Any]:
     """
     ensure_table_allowed(table)
     n = max(1, n)
-    meta = tool_columns(table)
+    meta = _catalog_columns(table)
+    tg = _t()
+    if tg.disk is not None and tg.schema_ver:
+        hit = tg.disk.get("examples", f"{table}|{n}", tg.schema_ver)
+        if hit is not None: return hit
     qname = _quote_ident(table)
 
     examples: Dict[str, List[Any]] = {}
-    with _connect() as c:
+    with _connection() as c:
         for m in meta:
             col = m["column"]
             dtype = (m["type"] or "").lower()
@@ -279,7 +1204,65 @@ def tool_columns_with_examples(table: str, n: int = 5) -> Dict[str, Any]:
                     _log("ERROR", "examples_failed", column=col, dtype=dtype, stmt=stmt, table=table)
                     examples[col] = []
 
-    return {"table": table, "columns": meta, "examples": examples}
+    res = {"table": table, "columns": meta, "examples": examples}
+    if tg.disk is not None and tg.schema_ver:
+        tg.disk.put("examples", f"{table}|{n}", res, tg.schema_ver, DISK_CACHE_TTL)
+    return res
+
+@_resilient
+def tool_fetch_blob(table: str, column: str, key: Any, offset: int = 0, length: int = None) -> Dict[str, Any]:
+    """
+    Liest einen (von query/sample zurückgestellten) LOB-Wert abschnittsweise über den Primärschlüssel.
+    - key: {pk_spalte: wert}, bei einspaltigem Schlüssel auch nur der Wert.
+    - offset/length in Bytes (binär) bzw. Zeichen (Text); length höchstens BINARY_MAX.
+    - Binärdaten kommen base64- (bzw. bei BINARY_MODE=hex hex-)kodiert zurück.
+    """
+    ensure_table_allowed(table)
+    ensure_column_allowed(table, column)
+    t = ".".join(p.strip().strip("[]") for p in table.strip().split("."))
+    meta = {m["column"].lower(): m for m in _catalog_columns(table)}
+    m = meta.get(column.strip("[]").lower())
+    if m is None: raise ValueError(f"Spalte '{column}' existiert nicht in '{table}'.")
+    pk = _schema_catalog().primary_key(t)
+    if not pk: raise ValueError(f"Tabelle '{table}' hat keinen Primärschlüssel – fetch_blob nicht möglich.")
+    if not isinstance(key, dict):
+        if len(pk) != 1: raise ValueError(f"Parameter 'key' muss ein Objekt mit {', '.join(pk)} sein.")
+        key = {pk[0]: key}
+    given = {k.strip("[]").lower(): v for k, v in key.items()}
+    missing = [c for c in pk if c.lower() not in given]
+    if missing: raise ValueError(f"Schlüsselspalten fehlen in 'key': {', '.join(missing)}")
+
+    offset = max(0, int(offset))
+    length = max(1, min(int(length or BINARY_MAX), BINARY_MAX))
+    dtype = (m["type"] or "").lower()
+    binary = dtype in ("image", "varbinary", "binary")
+    col_q = f"[{m['column'].replace(']', ']]')}]"
+    src = f"CAST({col_q} AS NVARCHAR(MAX))" if dtype == "xml" else col_q
+    where = " AND ".join(f"[{c.replace(']', ']]')}] = %s" for c in pk)
+    t0 = time.time()
+    with _connection() as c:
+        cur = c.cursor()
+        cur.execute(f"SET LOCK_TIMEOUT {_t().query_timeout * 1000};")
+        cur.execute(f"SELECT DATALENGTH({src}), SUBSTRING({src}, {offset + 1}, {length}) "
+                    f"FROM {_quote_ident(table)} WHERE {where}", tuple(given[c.lower()] for c in pk))
+        row = cur.fetchone()
+    if row is None: raise ValueError(f"Keine Zeile in '{table}' mit diesem Schlüssel.")
+
+    size, chunk = row
+    width = 1 if binary or dtype in ("char", "varchar", "text") else 2   # DATALENGTH zählt Bytes
+    total = size // width if size is not None else None
+    if chunk is not None and binary:
+        b = bytes(chunk); n = len(b)
+        data = b.hex() if BINARY_MODE == "hex" else base64.b64encode(b).decode("ascii")
+    else:
+        data = chunk; n = len(chunk) if chunk is not None else 0
+    return {
+        "table": table, "column": m["column"], "key": {c: _jsonify_value(given[c.lower()]) for c in pk},
+        "offset": offset, "length": n, "total": total, "unit": "bytes" if binary else "chars",
+        "encoding": ("hex" if BINARY_MODE == "hex" else "base64") if binary else None,
+        "data": data, "done": total is None or offset + n >= total,
+        "execution_ms": int((time.time() - t0) * 1000),
+    }
 
 def tool_explain(sql: str) -> Dict[str, Any]:
     """
@@ -347,38 +1330,95 @@ def tool_explain(sql: str) -> Dict[str, Any]:
 # ---- STDIO Loop ----
 def _log(level: str, msg: str, **kw):
     if level == "DEBUG" and LOG not in ("DEBUG",): return
-    entry = {"ts": time.time(), "level": level, "msg": msg, **kw}
+    entry = {"ts": time.time(), "level": level, "msg": msg, **tracing.log_fields(), **kw}
     print(json.dumps({"log": entry}), flush=True, file=sys.stderr)
 
-def _handle(req: Dict[str, Any]) -> Dict[str, Any]:
+_TOOLS = [
+    {"name": "tables",   "params": {}},
+    {"name": "columns",  "params": {"table": "str"}},
+    {"name": "columns_with_examples", "params": {"table": "str", "n": "int (optional)"}},
+    {"name": "query",    "params": {"sql": "str"}},
+    {"name": "sample",   "params": {"table": "str", "n": "int (optional)", "mode": "'top'|'random' (optional)",
+                                    "seed": "int (optional)", "columns": "list[str] (optional)",
+                                    "max_pages": "int (optional)"}},
+    {"name": "paginate", "params": {"sql": "str", "offset": "int", "fetch": "int"}},
+    {"name": "stats",    "params": {"table": "str", "sample_n": "int (optional)"}},
+    {"name": "explain",  "params": {"sql": "str"}},
+    {"name": "search_schema", "params": {"q": "str", "limit": "int (optional)", "kind": "'table'|'column' (optional)"}},
+    {"name": "profile_column", "params": {"table": "str", "column": "str", "top_k": "int (optional)",
+                                          "sample_pct": "float (optional)", "seed": "int (optional)"}},
+    {"name": "column_stats", "params": {"table": "str", "top_k": "int (optional)", "sample_rows": "int (optional)"}},
+    {"name": "watch",    "params": {"table": "str", "columns": "list[str] (optional)", "where": "str (optional)"}},
+    {"name": "fetch_blob", "params": {"table": "str", "column": "str", "key": "dict|scalar (Primärschlüssel)",
+                                      "offset": "int (optional)", "length": "int (optional)"}},
+]
+if len(TARGETS) > 1:
+    # jedes Tool nimmt optional ein Ziel; alternativ 'ziel:schema.tabelle' als table
+    for _tool in _TOOLS: _tool["params"]["target"] = f"{'|'.join(TARGETS)} (optional)"
+
+_recorder = Recorder()
+
+def _target_stats(tg: Target) -> Dict[str, Any]:
+    return {"profile": tg.profile_cache.stats(), "watch": tg.watch_cache.stats(), "pool": tg.pool.stats(),
+            "resilience": {"retries": tg.retries, "gave_up": tg.gave_up, "breaker": tg.breaker.stats()},
+            "db_slots": tg.slots.stats() if tg.slots else None,
+            "disk": tg.disk.stats() if tg.disk is not None else None,
+            "catalog": {"tables": len(tg.catalog.tables), "loaded_at": tg.catalog.loaded_at}}
+
+def cache_stats() -> Dict[str, Any]:
+    """Trefferquoten der Caches + Pool-Zustand (für Replay/Monitoring); Standardziel flach, alle unter 'targets'."""
+    stats = _target_stats(_t())
+    if len(_targets) > 1:
+        stats["targets"] = {name: _target_stats(tg) for name, tg in _targets.items()}
+    stats["trace_export"] = tracing.exporter_stats()
+    return stats
+
+def _handle(req: Dict[str, Any], transport: str = "stdio", traceparent: Optional[str] = None,
+            request_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ein Request inkl. Trace: traceparent/request_id kommen aus HTTP-Headern, sonst gilt die Request-id.
+    Mit TRACE_TIMING oder "timing": true enthält die Antwort unter "trace" die Zeiten je Phase.
+    """
+    action = (req.get("action") or "tools").lower()
+    trace = tracing.start(f"mssql.{action}", traceparent, request_id or req.get("id"),
+                          **{"mssql_mcp.action": action, "mssql_mcp.transport": transport})
+    started, t0 = time.time(), time.perf_counter()
+    resp = _routed(req)
+    tr = tracing.finish(trace, bool(resp.get("ok")), resp.get("error"),
+                        **{"mssql_mcp.error_kind": resp.get("error_kind")})
+    if TRACE_TIMING or req.get("timing"): resp["trace"] = tr.summary()
+    if _recorder.enabled:
+        _recorder.record(transport, req, started, (time.perf_counter() - t0) * 1000, resp, bool(resp.get("ok")))
+    return resp
+
+def _annotate_trace():
+    """Ziel und Datenbank als Span-Attribute des laufenden Traces."""
+    tr = tracing.current()
+    if tr is not None:
+        tg = _t()
+        tr.attrs.update({"mssql_mcp.target": tg.name, "db.system": "mssql", "db.name": tg.database})
+
+def _routed(req: Dict[str, Any]) -> Dict[str, Any]:
+    """Wählt das Ziel ('target' bzw. 'ziel:tabelle') und führt den Request darin aus."""
+    try:
+        target, req = _route(req)
+        with use_target(target):
+            _annotate_trace()
+            return _dispatch(req)
+    except ValueError as e:
+        return {"id": req.get("id") or str(uuid.uuid4()), "ok": False, "error": str(e)}
+
+def _dispatch(req: Dict[str, Any]) -> Dict[str, Any]:
     rid = req.get("id") or str(uuid.uuid4())
     action = (req.get("action") or "").lower()
     try:
         # Handle empty action as tools request (common in LM Studio)
         if action == "":
-            return {"id": rid, "ok": True, "result": {"tools": [
-                {"name": "tables",   "params": {}},
-                {"name": "columns",  "params": {"table": "str"}},
-                {"name": "columns_with_examples", "params": {"table": "str", "n": "int (optional)"}},
-                {"name": "query",    "params": {"sql": "str"}},
-                {"name": "sample",   "params": {"table": "str", "n": "int (optional)"}},
-                {"name": "paginate", "params": {"sql": "str", "offset": "int", "fetch": "int"}},
-                {"name": "stats",    "params": {"table": "str", "sample_n": "int (optional)"}},
-                {"name": "explain",  "params": {"sql": "str"}},
-            ]}}
+            return {"id": rid, "ok": True, "result": {"tools": _TOOLS}}
         if action == "ping":
             return {"id": rid, "ok": True, "result": "pong"}
         if action == "tools":
-            return {"id": rid, "ok": True, "result": {"tools": [
-                {"name": "tables",   "params": {}},
-                {"name": "columns",  "params": {"table": "str"}},
-                {"name": "columns_with_examples", "params": {"table": "str", "n": "int (optional)"}},
-                {"name": "query",    "params": {"sql": "str"}},
-                {"name": "sample",   "params": {"table": "str", "n": "int (optional)"}},
-                {"name": "paginate", "params": {"sql": "str", "offset": "int", "fetch": "int"}},
-                {"name": "stats",    "params": {"table": "str", "sample_n": "int (optional)"}},
-                {"name": "explain",  "params": {"sql": "str"}},
-            ]}}
+            return {"id": rid, "ok": True, "result": {"tools": _TOOLS}}
         if action == "tables":
             return {"id": rid, "ok": True, "result": tool_tables()}
         if action == "columns":
@@ -395,7 +1435,12 @@ def _handle(req: Dict[str, Any]) -> Dict[str, Any]:
         if action == "sample":
             table = req.get("table");  assert table, "Parameter 'table' fehlt."
             n = int(req.get("n", 50))
-            res = tool_sample(table, n).model_dump()
+            cols = req.get("columns")
+            if isinstance(cols, str): cols = [c for c in cols.split(",") if c.strip()]
+            seed = req.get("seed"); max_pages = req.get("max_pages")
+            res = tool_sample(table, n, req.get("mode") or "top",
+                              int(seed) if seed is not None else None, cols,
+                              int(max_pages) if max_pages is not None else None).model_dump()
             return {"id": rid, "ok": True, "result": res}
         if action == "paginate":
             sql = req.get("sql");      assert sql, "Parameter 'sql' fehlt."
@@ -411,20 +1456,95 @@ def _handle(req: Dict[str, Any]) -> Dict[str, Any]:
         if action == "explain":
             sql = req.get("sql");      assert sql, "Parameter 'sql' fehlt."
             return {"id": rid, "ok": True, "result": tool_explain(sql)}
+        if action == "search_schema":
+            q = req.get("q");          assert q, "Parameter 'q' fehlt."
+            limit = int(req.get("limit", 20))
+            return {"id": rid, "ok": True, "result": tool_search_schema(q, limit, req.get("kind"))}
+        if action == "profile_column":
+            table = req.get("table");  assert table, "Parameter 'table' fehlt."
+            column = req.get("column"); assert column, "Parameter 'column' fehlt."
+            top_k = int(req.get("top_k", 10))
+            pct = req.get("sample_pct"); seed = req.get("seed")
+            res = tool_profile_column(table, column, top_k,
+                                      float(pct) if pct is not None else None,
+                                      int(seed) if seed is not None else None)
+            return {"id": rid, "ok": True, "result": res}
+        if action == "column_stats":
+            table = req.get("table");  assert table, "Parameter 'table' fehlt."
+            res = tool_column_stats(table, int(req.get("top_k", 5)), int(req.get("sample_rows", 1000)))
+            return {"id": rid, "ok": True, "result": res}
+        if action == "watch":
+            table = req.get("table");  assert table, "Parameter 'table' fehlt."
+            cols = req.get("columns")
+            if isinstance(cols, str): cols = [c for c in cols.split(",") if c.strip()]
+            return {"id": rid, "ok": True, "result": tool_watch(table, cols, req.get("where") or None)}
+        if action == "fetch_blob":
+            table = req.get("table");  assert table, "Parameter 'table' fehlt."
+            column = req.get("column"); assert column, "Parameter 'column' fehlt."
+            assert "key" in req, "Parameter 'key' fehlt."
+            res = tool_fetch_blob(table, column, req["key"], int(req.get("offset", 0)),
+                                  int(req["length"]) if req.get("length") is not None else None)
+            return {"id": rid, "ok": True, "result": res}
         raise ValueError(f"Unbekannte action: '{action}'")
     except Exception as e:
+        if isinstance(e, CircuitOpenError):
+            _log("WARNING", "request_rejected", action=action, error=str(e))
+            return {"id": rid, "ok": False, "error": str(e), "error_kind": "circuit_open",
+                    "retry_after_s": round(max(e.retry_after, 0.1), 1)}
         _log("ERROR", "request_failed", action=action, error=str(e), tb=traceback.format_exc())
-        return {"id": rid, "ok": False, "error": str(e)}
+        resp = {"id": rid, "ok": False, "error": str(e)}
+        kind = classify(e)
+        if kind: resp["error_kind"] = kind   # Agent kann unterscheiden: vorübergehend vs. Query falsch
+        return resp
+
+# ---- Warm-up ----
+IMPORT_MS = None   # Importdauer dieses Moduls (inkl. pydantic/dotenv), gesetzt am Modulende
+_warmup_thread: Optional[threading.Thread] = None
+
+def warmup() -> Dict[str, Any]:
+    """Öffnet je Ziel Pool-Verbindungen und lädt den Schema-Katalog vor. Fehler werden nur geloggt."""
+    t0 = time.perf_counter()
+    info: Dict[str, Any] = {"import_ms": IMPORT_MS, "targets": {}}
+    try:
+        import pymssql  # noqa: F401  (Treiber-Import gehört zur Warm-up-Zeit)
+        info["driver_ms"] = int((time.perf_counter() - t0) * 1000)
+        info["ok"] = True
+    except Exception as e:
+        info.update(ok=False, error=str(e))
+    for name, tg in (_targets.items() if info["ok"] else ()):
+        ti: Dict[str, Any] = {}
+        try:
+            with use_target(name):
+                t1 = time.perf_counter()
+                tg.pool.fill(min(2, tg.pool.size))
+                ti["connect_ms"] = int((time.perf_counter() - t1) * 1000)
+                t1 = time.perf_counter()
+                cat = _schema_catalog(force=True)
+                ti.update(catalog_ms=int((time.perf_counter() - t1) * 1000), tables=len(cat.tables))
+        except Exception as e:
+            ti["error"] = str(e); info["ok"] = False   # ein nicht erreichbares Ziel bremst die anderen nicht
+        info["targets"][name] = ti
+    info["total_ms"] = int((time.perf_counter() - t0) * 1000)
+    _log("INFO" if info["ok"] else "ERROR", "warmup_done", **info)
+    return info
+
+def start_warmup() -> Optional[threading.Thread]:
+    """Startet warmup() einmalig in einem Daemon-Thread (WARMUP=false deaktiviert)."""
+    global _warmup_thread
+    if WARMUP and _warmup_thread is None:
+        _warmup_thread = threading.Thread(target=warmup, name="mssql-mcp-warmup", daemon=True)
+        _warmup_thread.start()
+    return _warmup_thread
 
 def run_stdio():
-    host, port = _parse_server_and_port(DB_SERVER)
-    _log("INFO", "mssql_mcp_server starting",
-         server=f"{host}:{port}", database=DB_DB,
-         allow_tables=sorted(list(ALLOW_TABLES)) or None,
-         allow_schemas=sorted(list(ALLOW_SCHEMAS)) or None,
-         row_limit=ROW_LIMIT, timeout=QUERY_TIMEOUT,
-         deny_columns=DENY_COLUMNS or None,
-         deny_patterns=DENY_PATTERNS or None)
+    tg = _t()
+    _log("INFO", "mssql_mcp_server starting", **tg.describe(),
+         deny_columns=tg.deny_columns or None,
+         deny_patterns=tg.deny_patterns or None,
+         targets={n: t.describe() for n, t in _targets.items()} if len(_targets) > 1 else None,
+         import_ms=IMPORT_MS)
+    start_warmup()
+    first = True
     for line in sys.stdin:
         line = line.strip()
         if not line: continue
@@ -433,5 +1553,12 @@ def run_stdio():
         except Exception:
             print(json.dumps({"ok": False, "error": "invalid_json"}), flush=True)
             continue
+        t0 = time.perf_counter()
         resp = _handle(req)
         print(json.dumps(resp), flush=True)
+        if first and (req.get("action") or "").lower() not in ("", "ping", "tools"):
+            first = False
+            _log("INFO", "first_call", action=req.get("action"), ms=int((time.perf_counter() - t0) * 1000))
+
+for _tg in _targets.values(): _tg.disk = _open_disk_cache(_tg)
+IMPORT_MS = int((time.perf_counter() - _T_IMPORT) * 1000)
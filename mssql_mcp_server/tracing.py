@@ -0,0 +1,226 @@
+# mssql_mcp_server/tracing.py
+"""
+Zeitaufschlüsselung je Request und Trace-Kontext, optional als OpenTelemetry-Spans (OTLP/JSON).
+
+- start() legt je Request einen Trace an: trace_id aus W3C-`traceparent` (HTTP-Header bzw. MCP
+  params._meta) oder neu, dazu eine Korrelations-ID (X-Request-Id bzw. JSON-RPC-/Request-id).
+  Beides steht über current() allen _log-Einträgen des Requests zur Verfügung.
+- phase(name) misst Abschnitte (guard, queue, connect, lock_timeout, execute, fetch, jsonify, render,
+  retry_wait). Verschachtelte Phasen zählen nur einmal, die äußere gewinnt.
+- finish() exportiert den Request als Server-Span mit den Phasen als Kind-Spans, wenn TRACE_EXPORT
+  gesetzt ist: Dateipfad (eine OTLP/JSON-Zeile je Batch) oder http(s)-URL eines Collectors
+  (z. B. http://localhost:4318/v1/traces). TRACE_SAMPLE (0..1) begrenzt den Anteil exportierter Traces,
+  ein `traceparent` mit sampled=0 wird respektiert. Export im Hintergrund-Thread.
+Bewusst ohne Abhängigkeiten (kein opentelemetry-sdk), damit auch mcp_server.py es früh importieren kann.
+"""
+import atexit, functools, json, os, queue, random, re, sys, threading, time, urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+MAX_EVENTS = 256   # Kind-Spans je Trace (Phasensummen zählen trotzdem weiter)
+
+_traceparent_rx = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Trace:
+    __slots__ = ("trace_id", "span_id", "parent_id", "sampled", "request_id", "name", "attrs",
+                 "start_ns", "end_ns", "dur_ns", "t0", "phases", "events", "_active")
+
+    def __init__(self, name: str, traceparent: Optional[str] = None, request_id: Any = None,
+                 attrs: Optional[Dict[str, Any]] = None):
+        m = _traceparent_rx.match((traceparent or "").strip().lower())
+        self.trace_id = m.group(1) if m else os.urandom(16).hex()
+        self.parent_id = m.group(2) if m else None
+        self.sampled = bool(int(m.group(3), 16) & 1) if m else None
+        self.span_id = os.urandom(8).hex()
+        self.request_id = str(request_id) if request_id is not None else None
+        self.name = name
+        self.attrs: Dict[str, Any] = dict(attrs or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.dur_ns = 0
+        self.t0 = time.perf_counter_ns()
+        self.phases: Dict[str, float] = {}
+        self.events: List[tuple] = []
+        self._active: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        total = (self.dur_ns or time.perf_counter_ns() - self.t0) / 1e6
+        phases = {k: round(v, 3) for k, v in self.phases.items()}
+        phases["other"] = round(max(total - sum(self.phases.values()), 0.0), 3)
+        return {"trace_id": self.trace_id, "request_id": self.request_id, "total_ms": round(total, 3),
+                "phases_ms": phases}
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("mssql_trace", default=None)
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+def log_fields() -> Dict[str, Any]:
+    tr = _current.get()
+    if tr is None: return {}
+    return {"trace_id": tr.trace_id, "request_id": tr.request_id} if tr.request_id else {"trace_id": tr.trace_id}
+
+
+@contextmanager
+def phase(name: str, **attrs):
+    tr = _current.get()
+    if tr is None or tr._active is not None:
+        yield; return
+    tr._active = name
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter_ns() - t0
+        tr._active = None
+        tr.phases[name] = tr.phases.get(name, 0.0) + dt / 1e6
+        if len(tr.events) < MAX_EVENTS:
+            tr.events.append((name, tr.start_ns + (t0 - tr.t0), dt, attrs or None))
+
+
+def timed(name: str):
+    """Decorator-Variante von phase()."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def start(name: str, traceparent: Optional[str] = None, request_id: Any = None, **attrs) -> tuple:
+    """Beginnt einen Request-Trace; liefert (Trace, Token) für finish()."""
+    tr = Trace(name, traceparent, request_id, attrs)
+    return tr, _current.set(tr)
+
+
+def finish(handle: tuple, ok: bool = True, error: Optional[str] = None, **attrs) -> Trace:
+    tr, token = handle
+    tr.dur_ns = time.perf_counter_ns() - tr.t0
+    tr.end_ns = tr.start_ns + tr.dur_ns
+    tr.attrs.update(attrs)
+    _current.reset(token)
+    exp = _exporter()
+    if exp is not None and (tr.sampled if tr.sampled is not None else random.random() < exp.sample):
+        exp.submit(tr, ok, error)
+    return tr
+
+
+# ---- OTLP/JSON-Export ----
+def _attr(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool): v = {"boolValue": value}
+    elif isinstance(value, int): v = {"intValue": str(value)}
+    elif isinstance(value, float): v = {"doubleValue": value}
+    else: v = {"stringValue": str(value)}
+    return {"key": key, "value": v}
+
+
+def _spans(tr: Trace, ok: bool, error: Optional[str]) -> List[Dict[str, Any]]:
+    attrs = [_attr(k, v) for k, v in tr.attrs.items() if v is not None]
+    if tr.request_id: attrs.append(_attr("mssql_mcp.request_id", tr.request_id))
+    root = {"traceId": tr.trace_id, "spanId": tr.span_id, "name": tr.name, "kind": 2,
+            "startTimeUnixNano": str(tr.start_ns), "endTimeUnixNano": str(tr.end_ns), "attributes": attrs,
+            "status": {"code": 1} if ok else {"code": 2, "message": (error or "")[:500]}}
+    if tr.parent_id: root["parentSpanId"] = tr.parent_id
+    out = [root]
+    for name, start_ns, dur_ns, ev_attrs in tr.events:
+        span = {"traceId": tr.trace_id, "spanId": os.urandom(8).hex(), "parentSpanId": tr.span_id,
+                "name": name, "kind": 3 if name in ("connect", "lock_timeout", "execute", "fetch") else 1,
+                "startTimeUnixNano": str(start_ns), "endTimeUnixNano": str(start_ns + dur_ns)}
+        if ev_attrs: span["attributes"] = [_attr(k, v) for k, v in ev_attrs.items() if v is not None]
+        out.append(span)
+    return out
+
+
+class _Exporter:
+    def __init__(self, dest: str, sample: float, service: str):
+        self.dest = dest
+        self.sample = sample
+        self.service = service
+        self.exported = 0
+        self.dropped = 0
+        self._q: "queue.Queue" = queue.Queue(maxsize=10000)
+        self._last_error = 0.0
+        threading.Thread(target=self._run, name="trace-export", daemon=True).start()
+        atexit.register(self.flush)
+
+    def submit(self, tr: Trace, ok: bool, error: Optional[str]):
+        try:
+            self._q.put_nowait((tr, ok, error))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._q.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            self._send(batch)
+            time.sleep(1.0)   # bis dahin sammeln statt je Request ein Schreib-/HTTP-Aufruf; Rest per atexit
+
+    def flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._q.get_nowait())
+            except queue.Empty:
+                break
+        if batch: self._send(batch)
+
+    def _send(self, batch: List[tuple]):
+        spans = [s for tr, ok, error in batch for s in _spans(tr, ok, error)]
+        body = {"resourceSpans": [{
+            "resource": {"attributes": [_attr("service.name", self.service), _attr("process.pid", os.getpid())]},
+            "scopeSpans": [{"scope": {"name": "mssql_mcp_server"}, "spans": spans}]}]}
+        data = json.dumps(body, separators=(",", ":"))
+        try:
+            if self.dest.startswith(("http://", "https://")):
+                req = urllib.request.Request(self.dest, data=data.encode("utf-8"), method="POST",
+                                             headers={"Content-Type": "application/json"})
+                urllib.request.urlopen(req, timeout=5).close()
+            else:
+                with open(self.dest, "a", encoding="utf-8") as f:
+                    f.write(data + "\n")
+            self.exported += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            if time.time() - self._last_error > 60:   # höchstens eine Meldung pro Minute
+                self._last_error = time.time()
+                print(json.dumps({"log": {"ts": time.time(), "level": "WARNING", "msg": "trace_export_failed",
+                                          "dest": self.dest, "error": str(e)}}), flush=True, file=sys.stderr)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"dest": self.dest, "exported": self.exported, "dropped": self.dropped, "queued": self._q.qsize()}
+
+
+_exp: Optional[_Exporter] = None
+_exp_checked = False
+_exp_lock = threading.Lock()
+
+
+def _exporter() -> Optional[_Exporter]:
+    """Liest TRACE_EXPORT beim ersten Bedarf (nach .env, das mcp_server.py erst mit den Tools lädt)."""
+    global _exp, _exp_checked
+    if not _exp_checked:
+        with _exp_lock:
+            if not _exp_checked:
+                dest = os.getenv("TRACE_EXPORT", "")
+                if dest:
+                    _exp = _Exporter(dest, float(os.getenv("TRACE_SAMPLE", "1.0")),
+                                     os.getenv("TRACE_SERVICE_NAME", "mssql-mcp"))
+                _exp_checked = True
+    return _exp
+
+
+def exporter_stats() -> Optional[Dict[str, Any]]:
+    exp = _exporter()
+    return exp.stats() if exp is not None else None
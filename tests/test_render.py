@@ -0,0 +1,88 @@
+# tests/test_render.py
+from mssql_mcp_server.render import render_rows
+
+
+def test_table_with_empty_and_constant_columns_in_footer():
+    rows = [{"id": i, "name": f"n{i}", "co": "CRONUS", "memo": None} for i in range(3)]
+    text, info = render_rows(rows)
+    lines = text.splitlines()
+    assert lines[0].split(" | ") == ["id", "name"]
+    assert lines[2:5] == [" 0 | n0", " 1 | n1", " 2 | n2"]
+    assert lines[5:] == ["same in all rows: co=CRONUS", "empty: memo"]
+    assert info["constant"] == ["co"] and info["empty"] == ["memo"] and info["rows_shown"] == 3
+
+
+def test_all_constant_renders_one_row():
+    text, info = render_rows([{"a": 1, "b": "x"}] * 5)
+    lines = text.splitlines()
+    assert lines[2].split(" | ") == ["1", "x"]
+    assert lines[3] == "… 4 more identical rows"
+    assert len(lines) == 4
+    assert info["rows"] == 5 and info["rows_shown"] == 1 and info["constant"] is None
+
+
+def test_all_empty_shows_columns_as_null():
+    text, info = render_rows([{"a": None, "b": None}] * 3)
+    lines = text.splitlines()
+    assert [v.strip() for v in lines[0].split(" | ")] == ["a", "b"]
+    assert [v.strip() for v in lines[2].split(" | ")] == ["NULL", "NULL"]
+    assert lines[3] == "… 2 more identical rows"
+    assert info["empty"] is None and info["columns_shown"] == 2
+
+
+def test_single_empty_row():
+    text, info = render_rows([{"a": None}])
+    assert text.splitlines()[2] == "NULL"
+    assert info["rows_shown"] == 1
+
+
+def test_constant_with_empty_columns_keeps_empty_in_footer():
+    text, info = render_rows([{"a": 1, "b": None}] * 2)
+    assert text.splitlines() == ["a", "-", "1", "… 1 more identical rows", "empty: b"]
+
+
+def test_csv_quotes_and_empty_null():
+    rows = [{"a": "x,y", "b": None}, {"a": "z", "b": 2}]
+    text, _ = render_rows(rows, fmt="csv")
+    assert text.splitlines() == ["a,b", '"x,y",', "z,2"]
+
+
+def test_long_cells_elided_and_newlines_escaped():
+    text, info = render_rows([{"a": "x" * 100}, {"a": "l1\nl2"}], max_cell=10)
+    lines = text.splitlines()
+    assert lines[2] == "x" * 9 + "…"
+    assert lines[3] == "l1\\nl2"
+    assert info["cells_elided"] == 1
+
+
+def test_budget_limits_rows():
+    rows = [{"id": i, "v": f"value {i}"} for i in range(1000)]
+    text, info = render_rows(rows, budget=500)
+    assert len(text.encode("utf-8")) <= 500
+    assert 0 < info["rows_shown"] < 1000
+    assert f"… {1000 - info['rows_shown']} more rows" in text
+
+
+def test_wide_header_drops_trailing_columns():
+    rows = [{f"column_{i:02d}": i + j for i in range(40)} for j in range(1, 3)]
+    text, info = render_rows(rows, budget=400)
+    assert info["columns_shown"] < 40
+    assert info["omitted"] == [f"column_{i:02d}" for i in range(info["columns_shown"], 40)]
+    assert f"{40 - info['columns_shown']} columns omitted" in text
+
+
+def test_no_rows():
+    assert render_rows([], ["a"]) == ("", {"rows": 0, "rows_shown": 0, "columns": 1})
+
+
+def test_footer_counts_against_budget():
+    rows = [{**{f"wide_column_{i:03d}": i + j for i in range(300)},
+             **{f"same_{i}": "x" * 50 for i in range(100)},
+             **{f"empty_{i}": None for i in range(100)}} for j in range(2)]
+    text, info = render_rows(rows, budget=2000)
+    assert len(text.encode("utf-8")) <= 2000
+    assert len(info["omitted"]) == 300 - info["columns_shown"]
+    footer = text.splitlines()[-3:]
+    assert footer[0].startswith("same in all rows: ") and footer[0].endswith("more")
+    assert footer[1].startswith("empty: empty_0, ") and footer[1].endswith("more")
+    assert footer[2].startswith(f"{len(info['omitted'])} columns omitted: ") and footer[2].endswith("more")
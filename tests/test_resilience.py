@@ -0,0 +1,114 @@
+# tests/test_resilience.py
+import time
+
+import pytest
+
+from mssql_mcp_server.resilience import (CONNECTION, DEADLOCK, LOCK_TIMEOUT, CircuitBreaker,
+                                         CircuitOpenError, classify, error_code)
+
+
+class OperationalError(Exception):   # wie pymssql: args = (nummer, meldung als bytes)
+    pass
+
+
+class InterfaceError(Exception):
+    pass
+
+
+@pytest.mark.parametrize("exc, kind", [
+    (OperationalError(1205, b"Transaction (Process ID 52) was deadlocked on lock resources"), DEADLOCK),
+    (OperationalError(1222, b"Lock request time out period exceeded."), LOCK_TIMEOUT),
+    (OperationalError(20047, b"DB-Lib error message 20047, severity 9:\nDBPROCESS is dead or not enabled\n"), CONNECTION),
+    (OperationalError(10054, b"An existing connection was forcibly closed by the remote host."), CONNECTION),
+    (InterfaceError("Connection is closed."), CONNECTION),
+    (OperationalError("DB-Lib error message 20009, severity 9:\nUnable to connect"), CONNECTION),
+    (OperationalError(b"DB-Lib error message 20003, severity 6:\nAdaptive Server connection timed out"), CONNECTION),
+    (Exception("Connection is closed."), CONNECTION),
+])
+def test_classify_transient(exc, kind):
+    assert classify(exc) == kind
+
+
+@pytest.mark.parametrize("exc", [
+    # Zahl nur im Meldungstext (Nutzdaten) – die echte Nummer 245 ist nicht wiederholbar
+    OperationalError(245, b"Conversion failed when converting the nvarchar value '10054' to data type int."),
+    OperationalError(207, b"Invalid column name 'connection is closed'."),
+    OperationalError(208, b"Invalid object name 'dbo.x'. DB-Lib error message 20047"),
+    OperationalError("Incorrect syntax near '1205'."),
+    ValueError("Nur SELECT erlaubt"),
+    CircuitOpenError("db", 1.0),
+])
+def test_classify_not_retryable(exc):
+    assert classify(exc) is None
+
+
+def test_error_code_trusts_numeric_code():
+    assert error_code(OperationalError(245, b"... '10054' ...")) == 245
+    assert error_code(OperationalError("DB-Lib error message 20017, severity 9:\nUnexpected EOF")) == 20017
+    assert error_code(OperationalError("value 1205 not found")) is None
+
+
+def _breaker(**kw):
+    changes = []
+    br = CircuitBreaker("db", on_change=lambda name, old, new: changes.append((old, new)), **kw)
+    return br, changes
+
+
+def test_breaker_opens_at_threshold_and_rejects():
+    br, changes = _breaker(threshold=3, reset_s=60)
+    for _ in range(2):
+        br.before(); br.failure()
+    assert br.state == "closed"
+    br.before(); br.failure()
+    assert br.state == "open" and changes == [("closed", "open")]
+    with pytest.raises(CircuitOpenError) as e:
+        br.before()
+    assert 0 < e.value.retry_after <= 60
+    assert br.rejected == 1
+
+
+def test_breaker_success_resets_failures():
+    br, _ = _breaker(threshold=2, reset_s=60)
+    br.failure(); br.success(); br.failure()
+    assert br.state == "closed" and br.failures == 1
+
+
+def test_breaker_half_open_probe_success_closes():
+    br, changes = _breaker(threshold=1, reset_s=60)
+    br.failure()
+    br.opened_at = time.time() - 61
+    br.before()   # Probe
+    assert br.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        br.before()   # nur eine Probe gleichzeitig
+    br.success()
+    assert br.state == "closed"
+    assert changes == [("closed", "open"), ("open", "half_open"), ("half_open", "closed")]
+    br.before()
+
+
+def test_breaker_half_open_probe_failure_reopens():
+    br, _ = _breaker(threshold=5, reset_s=60)
+    br.state, br.opened_at = "open", time.time() - 61
+    br.before()
+    br.failure()
+    assert br.state == "open"
+    with pytest.raises(CircuitOpenError):
+        br.before()
+
+
+def test_breaker_lost_probe_allows_new_probe():
+    br, _ = _breaker(threshold=1, reset_s=60)
+    br.failure()
+    br.opened_at = time.time() - 61
+    br.before()
+    br._probe_at = time.time() - 61   # Probe meldet sich nie zurück
+    br.before()
+    assert br.state == "half_open"
+
+
+def test_breaker_disabled():
+    br, _ = _breaker(threshold=0, reset_s=60)
+    for _ in range(10):
+        br.failure(); br.before()
+    assert br.state == "closed"